@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+'''
+Extracts the directory tree of an ISO into a directory, without mounting it
+
+Usage: extract_iso.py [-i] [-c] ISO_PATH DEST_DIR [WORKERS]
+    -i:         Incremental: DEST_DIR holds a previous extraction, only copy
+                files that changed and delete files no longer in the ISO
+    -c:         With -i, also compare file contents, not just size and mtime
+    ISO_PATH:   Full path to ISO to extract
+    DEST_DIR:   Dir to extract into. Will be created if required
+    WORKERS:    Number of files copied at once (default: 4)
+'''
+import sys
+import os
+import isoparser
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    incremental = '-i' in args
+    verify = '-c' in args
+    args = [x for x in args if x not in ('-i', '-c')]
+    if len(args) < 2:
+        print('Usage: %s [-i] [-c] ISO_PATH DEST_DIR [WORKERS]' % (
+            os.path.basename(sys.argv[0]),))
+        exit(1)
+    if not os.path.isfile(args[0]):
+        print('File not found: ' + args[0])
+        exit(1)
+
+    workers = int(args[2]) if len(args) > 2 else 4
+    with isoparser.parse(args[0]) as iso:
+        stats = iso.extract(args[1], workers=workers, incremental=incremental,
+                            verify=verify)
+    print('%d directories, %d files, %d symlinks, %d bytes' % (
+        stats.directories, stats.files, stats.symlinks, stats.bytes_copied))
+    if incremental:
+        print('%d unchanged (%d bytes saved), %d removed' % (
+            stats.unchanged, stats.bytes_saved, stats.removed))
@@ -1,23 +1,76 @@
 from __future__ import absolute_import
-from . import iso, source
+from . import cache, diskcache, eltorito, iso, source
 
+__all__ = ['cache', 'diskcache', 'eltorito', 'iso', 'source', 'parse']
 
-def parse(path_or_url, cache_content=False, min_fetch=16):
+
+def parse(path_or_url, cache_content=False, min_fetch=16, max_fetch=256, use_mmap=False,
+          cache_size=None, sector_cache=None, disk_cache=None, thread_safe=False,
+          dir_cache_size=1024, strict=False):
     """
     Returns an :class:`ISO` object for the given filesystem path or URL.
 
     cache_content:
       Whether to store sectors backing file content in the sector cache. If true, this will
       cause memory usage to grow to the size of the ISO as more file content get accessed.
-      Even if false (default), an individual Record object will cache its own file content
-      for the lifetime of the Record, once accessed.
+      Even if false (default), a Record object that is not part of a cached directory listing
+      will cache its own file content for the lifetime of the Record, once accessed.
 
     min_fetch:
       The smallest number of sectors to fetch in a single operation, to speed up sequential
       accesses, e.g. for directory traversal.  Defaults to 16 sectors, or 32 KiB.
+
+    max_fetch:
+      The read-ahead window starts at min_fetch sectors and doubles while accesses stay
+      sequential, up to this many sectors; random accesses shrink it again. Defaults to 256
+      sectors, or 512 KiB. Set equal to min_fetch for a fixed window.
+
+    use_mmap:
+      Map a local ISO into memory instead of reading it sector by sector. Sectors are then
+      never copied or cached: Record.content returns memoryview slices of the mapping,
+      which stay valid until the last of them is released, and the streams of get_stream()
+      copy from it straight into the buffers given to readinto(). Ignored for URLs.
+
+    cache_size:
+      Upper bound, in bytes, on the sector cache. Once exceeded, the least recently used
+      sectors are evicted. Defaults to None (unbounded).
+
+    sector_cache:
+      A cache object to use instead of a new :class:`cache.SectorCache`, e.g. one with a
+      different eviction policy. Its stats attribute is exposed as ISO.cache_stats.
+
+    disk_cache:
+      A :class:`diskcache.DiskCache`, or the path of a directory to keep one in, that
+      persists the sectors of remote ISOs across sources and runs. Only used for URLs, and
+      only if the server sends a length and an ETag or Last-Modified header.
+
+    thread_safe:
+      Give every thread its own cursor over a local ISO, with reads done by os.pread and
+      the sector cache shared under a lock, so that several threads can walk directories and
+      read files from the same ISO object at once. Ignored for URLs.
+
+    dir_cache_size:
+      How many parsed directory listings to keep, least recently used ones being dropped
+      first. Each directory is otherwise parsed only once. Defaults to 1024.
+
+    strict:
+      Check that both halves of every both-endian field agree, raising SourceError if not.
+      By default only the little-endian halves are read.
     """
+    kwargs = dict(cache_content=cache_content, min_fetch=min_fetch, max_fetch=max_fetch,
+                  cache=sector_cache, cache_size=cache_size, dir_cache_size=dir_cache_size,
+                  strict=strict)
     if path_or_url.startswith("http"):
-        src = source.HTTPSource(path_or_url, cache_content=cache_content, min_fetch=min_fetch)
+        if disk_cache is not None and not isinstance(disk_cache, diskcache.DiskCache):
+            disk_cache = diskcache.DiskCache(disk_cache)
+        src = source.HTTPSource(path_or_url, disk_cache=disk_cache, **kwargs)
+    elif use_mmap:
+        if thread_safe:
+            src = source.ThreadSafeMmapFileSource(path_or_url, **kwargs)
+        else:
+            src = source.MmapFileSource(path_or_url, **kwargs)
+    elif thread_safe:
+        src = source.ThreadSafeFileSource(path_or_url, **kwargs)
     else:
-        src = source.FileSource(path_or_url, cache_content=cache_content, min_fetch=min_fetch)
+        src = source.FileSource(path_or_url, **kwargs)
     return iso.ISO(src)
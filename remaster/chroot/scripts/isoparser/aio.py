@@ -0,0 +1,115 @@
+"""
+asyncio front end for isoparser (Python 3 only).
+
+asyncio has no non-blocking file I/O, so the blocking sources are driven from executor
+threads. Calls on one :class:`AsyncISO` are serialized, since its source has a single
+cursor, unless it was opened with thread_safe=True; different ISOs always proceed
+concurrently, up to a bound shared by the caller.
+"""
+import asyncio
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import parse
+
+
+class AsyncISO(object):
+    def __init__(self, iso, limiter=None, executor=None):
+        self.iso = iso
+        self._limiter = limiter
+        self._executor = executor
+        self._lock = None if iso.thread_safe else asyncio.Lock()
+
+    async def _run(self, fn, *args):
+        if self._lock is None:
+            return await self._call(fn, *args)
+        async with self._lock:
+            return await self._call(fn, *args)
+
+    async def _call(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        if self._limiter is None:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+        async with self._limiter:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def record(self, *path):
+        """
+        Retrieves a record for the given path, as :func:`ISO.record` does.
+        """
+        return await self._run(self.iso.record, *path)
+
+    async def listdir(self, *path):
+        """
+        Returns the records for the children of the directory at the given path.
+        """
+        return await self._run(lambda: self.iso.record(*path).children)
+
+    async def children(self, record):
+        """
+        Returns the records for the children of a directory record.
+        """
+        return await self._run(lambda: record.children)
+
+    async def content(self, record):
+        """
+        Returns the contents of a file record.
+        """
+        return await self._run(lambda: record.content)
+
+    async def read(self, *path):
+        """
+        Returns the contents of the file at the given path.
+        """
+        return await self._run(lambda: self.iso.record(*path).content)
+
+    async def prefetch(self, *paths):
+        """
+        Warms the sector cache for several paths at once, as :func:`ISO.prefetch` does.
+        """
+        return await self._run(self.iso.prefetch, *paths)
+
+    async def close(self):
+        await self._run(self.iso.close)
+
+
+async def open_iso(path_or_url, limiter=None, executor=None, **kwargs):
+    """
+    Returns an :class:`AsyncISO` for the given filesystem path or URL. Keyword arguments are
+    passed on to :func:`isoparser.parse`.
+
+    limiter:
+      An asyncio.Semaphore shared by the AsyncISOs whose blocking calls should count against
+      the same bound.
+    """
+    loop = asyncio.get_running_loop()
+    opener = functools.partial(parse, path_or_url, **kwargs)
+    if limiter is None:
+        iso = await loop.run_in_executor(executor, opener)
+    else:
+        async with limiter:
+            iso = await loop.run_in_executor(executor, opener)
+    return AsyncISO(iso, limiter=limiter, executor=executor)
+
+
+async def probe_many(paths_or_urls, probe, limit=8, **kwargs):
+    """
+    Opens each ISO and awaits probe(async_iso) for it, with at most limit blocking calls in
+    flight at any time. Returns the results in the order given; an ISO that could not be
+    opened or probed gives the exception raised instead.
+    """
+    limiter = asyncio.Semaphore(limit)
+
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        async def one(path_or_url):
+            async with await open_iso(path_or_url, limiter, executor, **kwargs) as aiso:
+                return await probe(aiso)
+
+        return await asyncio.gather(*[one(p) for p in paths_or_urls], return_exceptions=True)
@@ -0,0 +1,147 @@
+import threading
+
+from collections import OrderedDict
+
+
+class CacheStats(object):
+    """
+    Counters kept by a sector cache. bytes_fetched counts bytes read from the underlying
+    medium by the owning source, whether or not they ended up being cached.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_fetched = 0
+
+    def __repr__(self):
+        return "<CacheStats hits=%d misses=%d evictions=%d bytes_fetched=%d>" % (
+            self.hits, self.misses, self.evictions, self.bytes_fetched)
+
+
+class SectorCache(object):
+    """
+    A sector cache keyed by sector number, evicting the least recently used sectors once the
+    cached data exceeds max_bytes. A max_bytes of None means the cache is never trimmed.
+
+    Any object providing get(), put(), __contains__(), clear() and a stats attribute can be
+    passed to a Source in place of this class.
+    """
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.stats = CacheStats()
+        self._sectors = OrderedDict()
+
+    def __len__(self):
+        return len(self._sectors)
+
+    def __contains__(self, sector):
+        return sector in self._sectors
+
+    def get(self, sector):
+        """
+        Returns the data for the given sector, or None if it is not cached. Counts as a hit or
+        a miss, and marks the sector as most recently used.
+        """
+        data = self._sectors.pop(sector, None)
+        if data is None:
+            self.stats.misses += 1
+            return None
+        self._sectors[sector] = data
+        self.stats.hits += 1
+        return data
+
+    def put(self, sector, data):
+        old = self._sectors.pop(sector, None)
+        if old is not None:
+            self.size -= len(old)
+        self._sectors[sector] = data
+        self.size += len(data)
+        if self.max_bytes is not None:
+            while self.size > self.max_bytes and self._sectors:
+                _, evicted = self._sectors.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats.evictions += 1
+
+    def clear(self):
+        self._sectors.clear()
+        self.size = 0
+
+
+class LRUCache(object):
+    """
+    A cache holding at most max_items objects, evicting the least recently used ones. Has the
+    same interface as :class:`SectorCache`, for objects whose size in bytes doesn't matter.
+    """
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self.stats = CacheStats()
+        self._items = OrderedDict()
+
+    @property
+    def size(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        item = self._items.pop(key, None)
+        if item is None:
+            self.stats.misses += 1
+            return None
+        self._items[key] = item
+        self.stats.hits += 1
+        return item
+
+    def put(self, key, item):
+        self._items.pop(key, None)
+        self._items[key] = item
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self):
+        self._items.clear()
+
+
+class LockedCache(object):
+    """
+    Wraps a sector cache so that it can be shared by several threads. The wrapped cache's
+    methods are called with lock held.
+    """
+    def __init__(self, cache):
+        self._cache = cache
+        self.lock = threading.Lock()
+
+    @property
+    def stats(self):
+        return self._cache.stats
+
+    @property
+    def size(self):
+        return self._cache.size
+
+    def __len__(self):
+        with self.lock:
+            return len(self._cache)
+
+    def __contains__(self, sector):
+        with self.lock:
+            return sector in self._cache
+
+    def get(self, sector):
+        with self.lock:
+            return self._cache.get(sector)
+
+    def put(self, sector, data):
+        with self.lock:
+            self._cache.put(sector, data)
+
+    def clear(self):
+        with self.lock:
+            self._cache.clear()
@@ -0,0 +1,21 @@
+class Directory(object):
+    """
+    The parsed contents of a directory extent: a tuple of child records, in order, and a dict
+    mapping each child's name to its record (the first one, should names repeat). Listings
+    are built once per extent and shared, so they must not be modified.
+    """
+    def __init__(self, children):
+        # Consume the children first: computing a name can move the source cursor
+        self.entries = tuple(children)
+        self.by_name = {}
+        for entry in self.entries:
+            self.by_name.setdefault(entry.name, entry)
+
+    def __repr__(self):
+        return "<Directory entries=%d>" % len(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
@@ -0,0 +1,168 @@
+import fcntl
+import hashlib
+import os
+
+from six.moves import range
+
+
+class DiskCacheEntry(object):
+    """
+    The cached sectors of one remote ISO: a sparse file holding the sectors at their offsets
+    in the ISO, and a bitmap file with one bit per sector marking those present. The bitmap
+    is read and updated on disk (under an exclusive lock when writing), so entries opened by
+    several sources, or several processes, stay consistent.
+    """
+    def __init__(self, cache, base, length, sector_length):
+        self._cache = cache
+        self._sector_length = sector_length
+        self.n_sectors = (length + sector_length - 1) // sector_length
+        self.data_path = base + ".data"
+        self.map_path = base + ".map"
+        for path, size in ((self.data_path, length), (self.map_path, (self.n_sectors + 7) // 8)):
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.truncate(size)
+        self._data = open(self.data_path, "r+b")
+        self._map = open(self.map_path, "r+b")
+        os.utime(self.map_path, None)
+
+    def _bitmap(self, sector, count):
+        self._map.seek(sector // 8)
+        return bytearray(self._map.read((sector + count + 7) // 8 - sector // 8))
+
+    def runs(self, sector, count):
+        """
+        Splits a run of sectors into (sector, count, present) runs.
+        """
+        bitmap = self._bitmap(sector, count)
+        base = sector - sector % 8
+        runs = []
+        for s in range(sector, min(sector + count, self.n_sectors)):
+            bit = s - base
+            present = bool(bitmap[bit // 8] & (1 << (bit % 8)))
+            if runs and runs[-1][2] == present:
+                runs[-1][1] += 1
+            else:
+                runs.append([s, 1, present])
+        return [tuple(run) for run in runs]
+
+    def read(self, sector, count):
+        self._data.seek(sector * self._sector_length)
+        data = self._data.read(count * self._sector_length)
+        self._cache.sectors_read += count
+        return data
+
+    def write(self, sector, data):
+        count = (len(data) + self._sector_length - 1) // self._sector_length
+        self._data.seek(sector * self._sector_length)
+        self._data.write(data)
+        self._data.flush()
+        fcntl.flock(self._map, fcntl.LOCK_EX)
+        try:
+            bitmap = self._bitmap(sector, count)
+            base = sector - sector % 8
+            for s in range(sector, sector + count):
+                bit = s - base
+                bitmap[bit // 8] |= 1 << (bit % 8)
+            self._map.seek(sector // 8)
+            self._map.write(bitmap)
+            self._map.flush()
+        finally:
+            fcntl.flock(self._map, fcntl.LOCK_UN)
+        self._cache.sectors_written += count
+        self._cache.added(len(data), self)
+
+    def clear(self):
+        """
+        Drops every sector of this entry, e.g. when it alone exceeds the cache's size cap.
+        """
+        fcntl.flock(self._map, fcntl.LOCK_EX)
+        try:
+            for f in (self._data, self._map):
+                size = os.fstat(f.fileno()).st_size
+                f.truncate(0)
+                f.truncate(size)
+        finally:
+            fcntl.flock(self._map, fcntl.LOCK_UN)
+
+    def close(self):
+        self._data.close()
+        self._map.close()
+
+
+class DiskCache(object):
+    """
+    A persistent cache of remote ISO sectors under cache_dir, shared by every HTTPSource given
+    it and by later runs. Entries are keyed by URL, ETag (or Last-Modified) and length, so a
+    changed ISO gets a fresh entry. When the space used exceeds max_bytes, entries are evicted
+    least recently opened first.
+    """
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.sectors_read = 0
+        self.sectors_written = 0
+        self._usage = None
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def open(self, url, version, length, sector_length):
+        """
+        Returns the :class:`DiskCacheEntry` for the given URL, version (ETag or Last-Modified
+        header) and length, creating it if necessary.
+        """
+        key = hashlib.sha1(("%s\n%s\n%d" % (url, version, length)).encode("utf-8")).hexdigest()
+        entry = DiskCacheEntry(self, os.path.join(self.cache_dir, key), length, sector_length)
+        self._usage = None
+        return entry
+
+    def _entries(self):
+        """
+        Returns (last used time, disk usage in bytes, base path) for each entry.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".map"):
+                continue
+            base = os.path.join(self.cache_dir, name[:-4])
+            try:
+                used = os.stat(base + ".map").st_mtime
+                size = os.stat(base + ".data").st_blocks * 512
+            except OSError:
+                continue
+            entries.append((used, size, base))
+        return entries
+
+    def added(self, nbytes, entry):
+        if self.max_bytes is None:
+            return
+        if self._usage is None:
+            self._usage = sum(size for _, size, _ in self._entries())
+        else:
+            self._usage += nbytes
+        if self._usage > self.max_bytes:
+            self.evict(keep=entry)
+
+    def evict(self, keep=None):
+        """
+        Deletes entries, least recently opened first, until the cache fits in max_bytes. The
+        entry given as keep is only cleared, and only if it is too large on its own.
+        """
+        entries = sorted(self._entries())
+        usage = sum(size for _, size, _ in entries)
+        keep_base = keep.data_path[:-len(".data")] if keep is not None else None
+        for _, size, base in entries:
+            if usage <= self.max_bytes:
+                break
+            if base == keep_base:
+                continue
+            for suffix in (".data", ".map"):
+                try:
+                    os.remove(base + suffix)
+                except OSError:
+                    pass
+            usage -= size
+        if usage > self.max_bytes and keep is not None:
+            keep.clear()
+            usage = sum(size for _, size, _ in self._entries())
+        self._usage = usage
@@ -0,0 +1,158 @@
+"""
+El Torito boot catalogs.
+
+The boot record volume descriptor points to the boot catalog: a validation entry, the
+initial/default entry, then any number of sections, each a header followed by entries, one
+per boot image. All entries are 32 bytes long.
+"""
+import struct
+
+from six.moves import range
+
+
+PLATFORM_X86 = 0
+PLATFORM_PPC = 1
+PLATFORM_MAC = 2
+PLATFORM_EFI = 0xef
+
+PLATFORMS = {
+    PLATFORM_X86: "x86",
+    PLATFORM_PPC: "PowerPC",
+    PLATFORM_MAC: "Mac",
+    PLATFORM_EFI: "EFI",
+}
+
+EMULATIONS = ("none", "1.2M floppy", "1.44M floppy", "2.88M floppy", "hard disk")
+
+# Image sizes for the floppy emulations
+FLOPPY_SIZES = {1: 1228800, 2: 1474560, 3: 2949120}
+
+ENTRY_LENGTH = 32
+VIRTUAL_SECTOR_LENGTH = 512
+
+BOOTABLE = 0x88
+MORE_SECTIONS = 0x90
+FINAL_SECTION = 0x91
+EXTENSION = 0x44
+
+# Header ID, platform ID, reserved, ID string, checksum, key bytes
+VALIDATION_ENTRY = struct.Struct('<BB2x24sHBB')
+# Boot indicator, media type, load segment, system type, unused, sector count, load RBA,
+# then, in section entries only, selection criteria type and criteria
+BOOT_ENTRY = struct.Struct('<BBHBxHIB19s')
+# Header indicator, platform ID, number of entries, ID string
+SECTION_HEADER = struct.Struct('<BBH28s')
+
+
+class ElToritoError(Exception):
+    pass
+
+
+class BootEntry(object):
+    """
+    A boot image listed in the catalog. location is the sector the image starts at, and
+    sector_count its length in 512-byte virtual sectors, as loaded by the BIOS; with no
+    emulation, that is often only the first part of the image.
+    """
+    def __init__(self, source, platform_id, values, section_id=None):
+        (indicator, media_type, self.load_segment, self.system_type, self.sector_count,
+         self.location, self.criteria_type, self.criteria) = values
+        self._source = source
+        self.platform_id = platform_id
+        self.section_id = section_id
+        self.bootable = indicator == BOOTABLE
+        self.media_type = media_type & 0x0f
+        self.has_extensions = bool(media_type & 0x20)
+
+    def __repr__(self):
+        return "<BootEntry platform=%s emulation=%s location=%d sector_count=%d>" % (
+            self.platform, self.emulation, self.location, self.sector_count)
+
+    @property
+    def platform(self):
+        return PLATFORMS.get(self.platform_id, "0x%02x" % self.platform_id)
+
+    @property
+    def emulation(self):
+        if self.media_type < len(EMULATIONS):
+            return EMULATIONS[self.media_type]
+        return "0x%x" % self.media_type
+
+    @property
+    def length(self):
+        """
+        The length of the image in bytes: the emulated floppy's size, or else sector_count
+        virtual sectors.
+        """
+        if self.media_type in FLOPPY_SIZES:
+            return FLOPPY_SIZES[self.media_type]
+        return self.sector_count * VIRTUAL_SECTOR_LENGTH
+
+    def get_stream(self, length=None):
+        """
+        Returns a stream over the image, as Record.get_stream() does. length defaults to
+        :attr:`length`; pass the length of the file holding the image to read all of it.
+        """
+        return self._source.get_stream(self.location, self.length if length is None else length)
+
+    @property
+    def content(self):
+        self._source.seek(self.location, self.length, is_content=True)
+        return self._source.unpack_all()
+
+
+class BootCatalog(object):
+    """
+    A parsed boot catalog. entries holds the default entry first, then the entries of each
+    section in order.
+    """
+    def __init__(self, source, location):
+        self.location = location
+        raw_entries = self._raw_entries(source, location)
+
+        validation = next(raw_entries)
+        header_id, self.platform_id, self.id_string, _, key1, key2 = \
+            VALIDATION_ENTRY.unpack(validation)
+        self.id_string = self.id_string.rstrip(b"\x00 ")
+        if header_id != 1 or (key1, key2) != (0x55, 0xaa):
+            raise ElToritoError("Bad boot catalog validation entry")
+        if sum(struct.unpack('<16H', validation)) & 0xffff:
+            raise ElToritoError("Bad boot catalog checksum")
+
+        self.entries = [BootEntry(source, self.platform_id,
+                                  BOOT_ENTRY.unpack(next(raw_entries)))]
+        while True:
+            header = next(raw_entries)
+            indicator, platform_id, count, section_id = SECTION_HEADER.unpack(header)
+            if indicator not in (MORE_SECTIONS, FINAL_SECTION):
+                break
+            section_id = section_id.rstrip(b"\x00 ")
+            for _ in range(count):
+                entry = BootEntry(source, platform_id, BOOT_ENTRY.unpack(next(raw_entries)),
+                                  section_id)
+                self.entries.append(entry)
+                if entry.has_extensions:
+                    # Extension entries carry more selection criteria, which are not kept
+                    more = True
+                    while more:
+                        indicator_byte, flags = bytearray(next(raw_entries)[:2])
+                        more = indicator_byte == EXTENSION and bool(flags & 0x20)
+            if indicator == FINAL_SECTION:
+                break
+
+    def __repr__(self):
+        return "<BootCatalog entries=%d>" % len(self.entries)
+
+    @staticmethod
+    def _raw_entries(source, sector):
+        while True:
+            source.seek(sector)
+            if len(source) < ENTRY_LENGTH:
+                raise ElToritoError("Boot catalog runs past the end of the ISO")
+            for _ in range(len(source) // ENTRY_LENGTH):
+                yield source.unpack_raw(ENTRY_LENGTH)
+            sector += 1
+
+    @property
+    def platforms(self):
+        return sorted(set(entry.platform for entry in self.entries))
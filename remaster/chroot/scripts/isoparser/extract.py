@@ -0,0 +1,239 @@
+"""
+Extraction of the whole tree of an ISO to a directory, without mounting it.
+
+The tree is walked in the calling thread, which creates directories and symlinks as it goes,
+while file contents are copied by a thread pool (see :func:`Record.extract`), so that
+several extents are in flight at once. Rock Ridge modes (PX), symlinks (SL) and
+modification times (TF) are applied; directories get theirs last, once their contents are
+in place.
+
+In incremental mode, the tree is extracted over a previous extraction: files whose size and
+mtime (and optionally contents) match are left alone, entries gone from the ISO are deleted,
+and the bytes that did not need copying are counted in ExtractStats.bytes_saved.
+
+Names come from the ISO and are not trusted: a name that is empty, "." or "..", or holds a
+"/" or NUL byte, raises ExtractError, and nothing is ever written through a symlink, whether
+extracted from the ISO or already in dest_dir.
+"""
+import hashlib
+import os
+import shutil
+import stat
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import rockridge
+
+
+class ExtractError(Exception):
+    pass
+
+
+class ExtractStats(object):
+    def __init__(self):
+        self.directories = 0
+        self.files = 0
+        self.symlinks = 0
+        self.bytes_copied = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes_saved = 0
+
+    def __repr__(self):
+        return ("<ExtractStats directories=%d files=%d symlinks=%d bytes_copied=%d "
+                "unchanged=%d removed=%d bytes_saved=%d>") % (
+            self.directories, self.files, self.symlinks, self.bytes_copied,
+            self.unchanged, self.removed, self.bytes_saved)
+
+
+def metadata(record):
+    """
+    Returns (mode, symlink target, mtime) for a record. mode is None without a Rock Ridge PX
+    entry, and target None unless there are SL entries; mtime comes from the TF entry,
+    falling back to the recording date.
+    """
+    mode = None
+    target = None
+    mtime = None
+    for entry in record.susp_entries:
+        if isinstance(entry, rockridge.PX):
+            mode = entry.mode
+        elif isinstance(entry, rockridge.SL):
+            target = (target or b"") + entry.path
+        elif isinstance(entry, rockridge.TF):
+            mtime = entry.timestamps.get('modify')
+    if target is not None and len(target) > 1:
+        target = target.rstrip(b"/")
+    if mtime is None:
+        mtime = record.timestamp
+    return mode, target, mtime
+
+
+def _destination(dest_dir, path, parents):
+    """
+    Returns where the entry at path, a tuple of names, goes under dest_dir. Raises
+    ExtractError if a name is unsafe, or if the parent is not among parents, the directories
+    made or checked so far.
+    """
+    for name in path:
+        if not name or name in (b".", b"..") or b"/" in name or b"\0" in name:
+            raise ExtractError("Unsafe name in ISO: %r" % (b"/".join(path),))
+    parent = os.path.join(dest_dir, *path[:-1])
+    if parent not in parents:
+        raise ExtractError("Parent of %r is not an extracted directory" % (b"/".join(path),))
+    return os.path.join(parent, path[-1])
+
+
+def _set_metadata(path, mode, mtime):
+    if mode is not None:
+        os.chmod(path, mode & 0o7777)
+    os.utime(path, (mtime, mtime))
+
+
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+def _digest(readinto):
+    digest = hashlib.sha1()
+    buff = memoryview(bytearray(1024 * 1024))
+    while True:
+        n = readinto(buff)
+        if not n:
+            return digest.digest()
+        digest.update(buff[:n])
+
+
+def _unchanged(record, path, mtime, verify):
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(st.st_mode) or st.st_size != record.length or \
+            int(st.st_mtime) != int(mtime):
+        return False
+    if not verify:
+        return True
+    with open(path, 'rb', buffering=0) as f:
+        existing = _digest(f.readinto)
+    stream = record.get_stream()
+    try:
+        return _digest(stream.readinto) == existing
+    finally:
+        stream.close()
+
+
+def _extract_file(record, path, mode, mtime, incremental=False, verify=False):
+    """
+    Returns (whether the file was left alone, bytes copied or saved).
+    """
+    if incremental:
+        if _unchanged(record, path, mtime, verify):
+            _set_metadata(path, mode, mtime)
+            return True, record.length
+        if os.path.lexists(path):
+            _remove(path)
+    elif os.path.islink(path):
+        # Record.extract() would write through it
+        os.unlink(path)
+    copied = record.extract(path)
+    _set_metadata(path, mode, mtime)
+    return False, copied
+
+
+def _make_writable(dest_dir):
+    # A previous extraction leaves directories with their ISO modes, often read-only
+    for root, _, _ in os.walk(dest_dir):
+        mode = stat.S_IMODE(os.lstat(root).st_mode)
+        if not mode & stat.S_IWUSR:
+            os.chmod(root, mode | stat.S_IWUSR)
+
+
+def _remove_vanished(dest_dir, keep, stats):
+    # os.walk() lists symlinks to directories in dirs, but does not follow them
+    for root, dirs, files in os.walk(dest_dir):
+        for name in list(dirs):
+            path = os.path.join(root, name)
+            if path not in keep:
+                _remove(path)
+                dirs.remove(name)
+                stats.removed += 1
+        for name in files:
+            path = os.path.join(root, name)
+            if path not in keep:
+                os.unlink(path)
+                stats.removed += 1
+
+
+def extract_tree(iso, dest_dir, workers=4, incremental=False, verify=False):
+    """
+    Recreates the tree of an :class:`ISO` under dest_dir, which is created if needed, and
+    returns an :class:`ExtractStats`. Up to workers files are copied at once.
+
+    If incremental is true, dest_dir may hold a previous extraction: only files that
+    differ in size or mtime are copied, or, if verify is also true, whose contents differ
+    (compared by SHA-1, which reads both copies), and entries not in the ISO are deleted.
+
+    Raises ExtractError, having possibly extracted part of the tree, if the ISO has an entry
+    that would be written outside of dest_dir.
+    """
+    dest_dir = os.fsencode(dest_dir)
+    if not os.path.isdir(dest_dir):
+        os.makedirs(dest_dir)
+    dest_dir = os.path.realpath(dest_dir)
+    if incremental:
+        _make_writable(dest_dir)
+    stats = ExtractStats()
+    root_mode, _, root_mtime = metadata(iso.root.current_directory)
+    directories = [(dest_dir, root_mode, root_mtime)]
+    parents = set([dest_dir])
+    seen = set()
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, record in iso.walk():
+            dest = _destination(dest_dir, path, parents)
+            if dest in seen:
+                raise ExtractError("Duplicate entry in ISO: %r" % (b"/".join(path),))
+            seen.add(dest)
+            mode, target, mtime = metadata(record)
+            if target is not None:
+                if os.path.islink(dest) and os.readlink(dest) == target:
+                    stats.unchanged += 1
+                else:
+                    if os.path.lexists(dest):
+                        _remove(dest)
+                    os.symlink(target, dest)
+                os.utime(dest, (mtime, mtime), follow_symlinks=False)
+                stats.symlinks += 1
+            elif record.is_directory:
+                if os.path.islink(dest) or (os.path.lexists(dest) and not os.path.isdir(dest)):
+                    _remove(dest)
+                if not os.path.isdir(dest):
+                    os.mkdir(dest)
+                if os.path.realpath(dest) != dest:
+                    raise ExtractError("Directory leads out of %r: %r" % (dest_dir, dest))
+                parents.add(dest)
+                directories.append((dest, mode, mtime))
+                stats.directories += 1
+            else:
+                futures.append(pool.submit(
+                    _extract_file, record, dest, mode, mtime, incremental, verify))
+                stats.files += 1
+        for future in futures:
+            unchanged, nbytes = future.result()
+            if unchanged:
+                stats.unchanged += 1
+                stats.bytes_saved += nbytes
+            else:
+                stats.bytes_copied += nbytes
+
+    if incremental:
+        _remove_vanished(dest_dir, seen, stats)
+
+    # Deepest first, so that setting a directory's mtime is not undone by its children
+    for dest, mode, mtime in reversed(directories):
+        _set_metadata(dest, mode, mtime)
+    return stats
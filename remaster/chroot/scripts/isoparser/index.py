@@ -0,0 +1,211 @@
+"""
+A compact index of the whole directory tree of an ISO.
+
+Entries are numbered in the order they were found, the root being 0, and described by
+parallel arrays; names are concatenated into a single blob. The children of a directory are
+numbered consecutively, so a directory only needs the number of its first child and its
+child count. An index can be saved to a sidecar file and memory-mapped back, so that a
+known ISO can be explored again without reading any of its directories.
+"""
+import array
+import heapq
+import mmap
+import os
+import struct
+import sys
+
+
+FLAG_HIDDEN = 1
+FLAG_DIRECTORY = 2
+
+MAGIC = b"ISOIDX2" + (b"L" if sys.byteorder == "little" else b"B")
+
+# magic, key (a SHA-1 digest), entry count, length of the names blob
+HEADER = struct.Struct("<8s20sIQ")
+
+# Array name, typecode and whether it has one item more than there are entries. The 8-byte
+# arrays come first and each array is padded to 8 bytes, keeping them all aligned.
+LAYOUT = (
+    ("mtimes", "q", False),
+    ("lengths", "Q", False),
+    ("name_offsets", "I", True),
+    ("parents", "i", False),
+    ("child_start", "i", False),
+    ("child_count", "I", False),
+    ("locations", "I", False),
+    ("flags", "B", False),
+)
+
+
+class TreeIndexError(Exception):
+    pass
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+class TreeIndex(object):
+    def __init__(self, key, names, arrays):
+        self.key = key
+        self._names = names
+        for name, _, _ in LAYOUT:
+            setattr(self, name, arrays[name])
+        self._by_name = None
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __repr__(self):
+        return "<TreeIndex entries=%d>" % len(self)
+
+    @classmethod
+    def build(cls, iso, key=b""):
+        """
+        Builds the index of an :class:`ISO`. Directories are read in order of their extent
+        location, which on most ISOs makes this a single sequential pass over the directory
+        extents.
+        """
+        names = []
+        arrays = dict((name, array.array(typecode)) for name, typecode, _ in LAYOUT)
+        arrays["name_offsets"].append(0)
+
+        def add(record, name, parent):
+            arrays["mtimes"].append(int(record.timestamp))
+            arrays["name_offsets"].append(arrays["name_offsets"][-1] + len(name))
+            arrays["parents"].append(parent)
+            arrays["child_start"].append(-1)
+            arrays["child_count"].append(0)
+            arrays["locations"].append(record.location)
+            arrays["lengths"].append(record.length)
+            arrays["flags"].append((FLAG_DIRECTORY if record.is_directory else 0) |
+                                   (FLAG_HIDDEN if record.is_hidden else 0))
+            names.append(name)
+            return len(arrays["parents"]) - 1
+
+        pending = [(iso.root.location, add(iso.root, b"", -1), iso.root)]
+        seen = set()
+        while pending:
+            location, idx, record = heapq.heappop(pending)
+            if location in seen:
+                continue
+            seen.add(location)
+            children = list(record.children_unsafe)
+            arrays["child_start"][idx] = len(arrays["parents"])
+            arrays["child_count"][idx] = len(children)
+            for child in children:
+                child_idx = add(child, child.name, idx)
+                if child.is_directory:
+                    heapq.heappush(pending, (child.location, child_idx, child))
+
+        return cls(key, b"".join(names), arrays)
+
+    @classmethod
+    def load(cls, path, key=None):
+        """
+        Memory-maps an index saved by :func:`save`. Raises TreeIndexError if the file is not
+        an index, is truncated, or if key is given and the index was saved with a different
+        one.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                # Also keeps mmap from failing on an empty file
+                raise TreeIndexError("Truncated index: %s" % path)
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        magic, file_key, count, names_length = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise TreeIndexError("Not an index: %s" % path)
+        if key is not None and file_key != key:
+            raise TreeIndexError("Index is for another ISO: %s" % path)
+        sizes = [(count + extra) * array.array(typecode).itemsize
+                 for _, typecode, extra in LAYOUT]
+        expected = HEADER.size + sum(_padded(size) for size in sizes) + names_length
+        if len(view) != expected:
+            raise TreeIndexError("%s index: %s" % (
+                "Truncated" if len(view) < expected else "Corrupt", path))
+        offset = HEADER.size
+        arrays = {}
+        for (name, typecode, _), size in zip(LAYOUT, sizes):
+            arrays[name] = view[offset:offset + size].cast(typecode)
+            offset += _padded(size)
+        names = view[offset:offset + names_length]
+        if arrays["name_offsets"][count] != names_length:
+            raise TreeIndexError("Corrupt index: %s" % path)
+        return cls(file_key, names, arrays)
+
+    def save(self, path):
+        """
+        Writes the index to path, replacing any existing file atomically.
+        """
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.key, len(self), len(self._names)))
+            for name, _, _ in LAYOUT:
+                data = getattr(self, name).tobytes()
+                f.write(data)
+                f.write(b"\0" * (_padded(len(data)) - len(data)))
+            f.write(bytes(self._names))
+            f.flush()
+            # Make sure the data is on disk before the rename can replace a good index
+            os.fsync(f.fileno())
+        os.rename(tmp_path, path)
+
+    def name(self, idx):
+        return bytes(self._names[self.name_offsets[idx]:self.name_offsets[idx + 1]])
+
+    def path(self, idx):
+        """
+        Returns the path components of an entry, as a tuple.
+        """
+        parts = []
+        while idx > 0:
+            parts.append(self.name(idx))
+            idx = self.parents[idx]
+        return tuple(reversed(parts))
+
+    def is_directory(self, idx):
+        return bool(self.flags[idx] & FLAG_DIRECTORY)
+
+    def children(self, idx):
+        """
+        Returns the entry numbers of the children of a directory.
+        """
+        start = self.child_start[idx]
+        if start < 0:
+            return range(0)
+        return range(start, start + self.child_count[idx])
+
+    def lookup(self, *path):
+        """
+        Returns the entry number for the given path, raising KeyError, with the first
+        component not found, if there is none.
+        """
+        if self._by_name is None:
+            by_name = {}
+            for idx in range(len(self) - 1, 0, -1):
+                # Iterating backwards leaves the first of any duplicate names in place
+                by_name[(self.parents[idx], self.name(idx))] = idx
+            self._by_name = by_name
+        idx = 0
+        for part in path:
+            try:
+                idx = self._by_name[(idx, part)]
+            except KeyError:
+                raise KeyError(part)
+        return idx
+
+    def walk(self, idx=0):
+        """
+        Yields (path, entry number) for every entry below the given directory, depth first.
+        """
+        stack = [(self.path(idx), iter(self.children(idx)))]
+        while stack:
+            path, children = stack[-1]
+            for child in children:
+                child_path = path + (self.name(child),)
+                yield child_path, child
+                if self.is_directory(child):
+                    stack.append((child_path, iter(self.children(child))))
+                    break
+            else:
+                stack.pop()
@@ -1,9 +1,23 @@
+import fnmatch
+import hashlib
+import os
+import re
+import struct
+
 from . import susp, rockridge
+from .eltorito import BootCatalog
+from .index import TreeIndex, TreeIndexError
+
+
+def _to_bytes(s):
+    return s if isinstance(s, bytes) else s.encode("utf-8")
 
 
 class ISO(object):
     def __init__(self, source):
         self._source = source
+        self._tree_index = None
+        self._boot_catalog = None
 
         # Unpack volume descriptors
         self.volume_descriptors = {}
@@ -14,9 +28,12 @@ class ISO(object):
 
             vd = self._source.unpack_volume_descriptor()
             self.volume_descriptors[vd.name] = vd
+            if vd.name == "supplementary" and vd.joliet:
+                self.volume_descriptors['joliet'] = vd
 
             if vd.name == "terminator":
                 break
+        self._vd_sectors = sector - 16
 
         # Unpack the path table
         self._source.seek(
@@ -37,6 +54,15 @@ class ISO(object):
         else:
             self._source.susp_starting_index = False
 
+        # Without Rock Ridge, use the Joliet hierarchy, if any, for its long names
+        self.joliet = False
+        joliet_vd = self.volume_descriptors.get('joliet')
+        if joliet_vd is not None and not self._source.rockridge:
+            self.joliet = True
+            self.root = joliet_vd.root_record
+            self._source.seek(joliet_vd.path_table_l_loc, joliet_vd.path_table_size)
+            self.path_table = self._source.unpack_path_table(joliet=True)
+
     def __enter__(self):
         return self
 
@@ -46,41 +72,228 @@ class ISO(object):
     def close(self):
         self._source.close()
 
+    @property
+    def index_key(self):
+        """
+        A SHA-1 digest identifying this ISO, from its volume ID, its size and its volume
+        descriptors.
+        """
+        primary = self.volume_descriptors['primary']
+        self._source.seek(16, self._vd_sectors * 2048)
+        key = hashlib.sha1(primary.volume_identifier)
+        key.update(struct.pack('<I', primary.volume_space_size))
+        key.update(self._source.unpack_all())
+        return key.digest()
+
+    def tree_index(self, sidecar_dir=None):
+        """
+        Returns a :class:`TreeIndex` of the whole directory tree. If sidecar_dir is given, an
+        index saved there for this ISO (see index_key) is memory-mapped instead of building
+        one, and a newly built index is saved there, creating sidecar_dir if need be. Once
+        there is an index, :func:`record` and :func:`find` look paths up in it instead of
+        reading directories.
+        """
+        if self._tree_index is not None:
+            return self._tree_index
+        key = self.index_key
+        path = None
+        if sidecar_dir is not None:
+            path = os.path.join(sidecar_dir, "%s.isoidx" % hashlib.sha1(key).hexdigest())
+            try:
+                self._tree_index = TreeIndex.load(path, key)
+            except (IOError, OSError, TreeIndexError):
+                pass
+        if self._tree_index is None:
+            self._tree_index = TreeIndex.build(self, key)
+            if path is not None:
+                if not os.path.isdir(sidecar_dir):
+                    os.makedirs(sidecar_dir)
+                self._tree_index.save(path)
+        return self._tree_index
+
+    @property
+    def thread_safe(self):
+        """
+        Whether several threads may use this ISO, and the records read from it, at once.
+        """
+        return self._source.thread_safe
+
+    @property
+    def cache_stats(self):
+        """
+        Hit, miss, eviction and bytes-fetched counters of the underlying sector cache.
+        """
+        return self._source.cache.stats
+
     def record(self, *path):
         """
         Retrieves a record for the given path.
         """
+        if self._tree_index is not None:
+            if not self._source.rockridge and not self.joliet:
+                path = [part.upper() for part in path]
+            return self._index_record(self._tree_index.lookup(*path))
+
         record = None
         if self._source.rockridge:
-            # In Rock Ridge mode, we can't use the path table
+            # The path table only has ISO9660 names, so it can't be used with Rock Ridge
             pivot = 0
         else:
-            path = [part.upper() for part in path]
+            if not self.joliet:
+                path = [part.upper() for part in path]
             pivot = len(path)
 
-
         # Resolve as much of the path as possible via the path table
-        while pivot > 0:
+        while record is None and pivot > 0:
             try:
                 record = self.path_table.record(*path[:pivot])
             except KeyError:
                 pivot -= 1
-            else:
-                break
 
         if record is None:
             record = self.root
 
         # Resolve the remainder of the path by walking record children
         for part in path[pivot:]:
-            for child in record.children_unsafe:
-                # Must save the cursor since child.name can cause a seek
-                saved_cursor = self._source.save_cursor()
-                if child.name == part:
-                    record = child
+            record = self._child(record, part)
+
+        return record
+
+    def _index_record(self, idx):
+        """
+        Returns the record of a :class:`TreeIndex` entry. Only the listing of the directory
+        holding it is read, found through the index.
+        """
+        index = self._tree_index
+        if idx == 0:
+            return self.root
+        parent = index.parents[idx]
+        self._source.seek(index.locations[parent], index.lengths[parent])
+        directory = self._source.unpack_record(self.joliet)  # current directory
+        return self._child(directory, index.name(idx))
+
+    def _child(self, record, part):
+        try:
+            return record.listing.by_name[part]
+        except KeyError:
+            raise KeyError(part)
+
+    def walk(self, *path):
+        """
+        Yields (path, record) for every entry below the directory at the given path, depth
+        first, path being a tuple of components. Each directory is read once, and only when
+        the walk reaches it, so stopping early saves reading the rest of the tree.
+        """
+        stack = [(tuple(path), iter(self.record(*path).listing.entries))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                child_path = parent + (child.name,)
+                yield child_path, child
+                if child.is_directory:
+                    stack.append((child_path, iter(child.listing.entries)))
                     break
-                self._source.restore_cursor(saved_cursor)
             else:
-                raise KeyError(part)
+                stack.pop()
 
-        return record
+    def glob(self, pattern, ignore_case=False, is_dir=None):
+        """
+        Yields (path, record) for entries matching a shell-style pattern. A pattern without
+        a '/', like '*.efi', is matched against the names of entries at any depth. Otherwise
+        its components are matched against path components, '*' never matching a '/': then
+        only directories that can lead to a match are read, e.g. just /EFI and /EFI/BOOT for
+        'EFI/BOOT/*.efi'. is_dir, if not None, restricts matches to directories or files.
+        """
+        pattern = _to_bytes(pattern).strip(b"/")
+        if ignore_case:
+            pattern = pattern.lower()
+        if b"/" not in pattern:
+            for path, record in self.walk():
+                name = path[-1].lower() if ignore_case else path[-1]
+                if (is_dir is None or record.is_directory == is_dir) and \
+                        fnmatch.fnmatchcase(name, pattern):
+                    yield path, record
+            return
+
+        parts = pattern.split(b"/")
+        level = [((), self.root)]
+        for depth, part in enumerate(parts):
+            last = depth == len(parts) - 1
+            next_level = []
+            for path, record in level:
+                for child in record.listing.entries:
+                    name = child.name.lower() if ignore_case else child.name
+                    if not fnmatch.fnmatchcase(name, part):
+                        continue
+                    if last:
+                        if is_dir is None or child.is_directory == is_dir:
+                            yield path + (child.name,), child
+                    elif child.is_directory:
+                        next_level.append((path + (child.name,), child))
+            level = next_level
+
+    def find(self, regex, ignore_case=False, is_dir=None):
+        """
+        Yields (path, record) for entries whose path, joined with '/' and without a leading
+        '/', matches the given regular expression (using re.search). is_dir, if not None,
+        restricts matches to directories or files. With a :func:`tree_index`, paths are
+        matched against the index, and only the directories holding matches are read.
+        """
+        regex = re.compile(_to_bytes(regex), re.IGNORECASE if ignore_case else 0)
+        index = self._tree_index
+        if index is not None:
+            for path, idx in index.walk():
+                if (is_dir is None or index.is_directory(idx) == is_dir) and \
+                        regex.search(b"/".join(path)):
+                    yield path, self._index_record(idx)
+            return
+        for path, record in self.walk():
+            if (is_dir is None or record.is_directory == is_dir) and \
+                    regex.search(b"/".join(path)):
+                yield path, record
+
+    @property
+    def boot_catalog(self):
+        """
+        The El Torito :class:`eltorito.BootCatalog`, parsed on first use, or None if the ISO
+        is not bootable. Raises eltorito.ElToritoError if the catalog is invalid.
+        """
+        boot_vd = self.volume_descriptors.get('boot')
+        if boot_vd is None or boot_vd.catalog_location is None:
+            return None
+        if self._boot_catalog is None:
+            self._boot_catalog = BootCatalog(self._source, boot_vd.catalog_location)
+        return self._boot_catalog
+
+    def extract(self, dest_dir, workers=4, incremental=False, verify=False):
+        """
+        Extracts the whole tree to dest_dir, copying up to workers files at once, and returns
+        an :class:`extract.ExtractStats`. With incremental, only what changed since a
+        previous extraction to dest_dir is copied. See :func:`extract.extract_tree`.
+        Python 3 only: the extract module is imported here, on demand.
+        """
+        from .extract import extract_tree
+        return extract_tree(self, dest_dir, workers, incremental, verify)
+
+    def prefetch(self, *paths):
+        """
+        Warms the sector cache for the given paths, each a tuple of path components, so that
+        looking them up and reading their contents afterwards needs no further I/O. The paths
+        are resolved side by side, one directory level at a time, and the extents needed at
+        each level are fetched as a single batch. Paths that do not exist are skipped.
+        """
+        if not self._source.rockridge and not self.joliet:
+            paths = [[part.upper() for part in path] for path in paths]
+        pending = [(self.root, tuple(path)) for path in paths]
+        while pending:
+            self._source.prefetch(set(
+                extent for record, _ in pending for extent in record.extents))
+            resolved = []
+            for record, path in pending:
+                if not path or not record.is_directory:
+                    continue
+                try:
+                    resolved.append((self._child(record, path[0]), path[1:]))
+                except KeyError:
+                    pass
+            pending = resolved
@@ -1,31 +1,57 @@
+import array
+
 from . import record
 
 
 class PathTable(object):
-    def __init__(self, source):
+    """
+    The directories listed in a path table. Entry i is described by locations[i] and
+    parents[i], the index of its parent entry (the root, entry 0, is its own parent), and is
+    found by name through a dict keyed by (parent index, name). Names are interned, so the
+    many directories sharing a name share a single copy of it. Joliet names are converted
+    from UCS-2 to UTF-8.
+    """
+    def __init__(self, source, joliet=False):
         self._source = source
-        self.paths = {}
+        self.joliet = joliet
+        self.locations = array.array('I')
+        self.parents = array.array('i')
+        self._index = {}
 
-        paths_list = []
+        names = {}
 
         while len(source) > 0:
             name_length = source.unpack('B')
             _           = source.unpack('B')
             location    = source.unpack('<I')
             parent_idx  = source.unpack('<H') - 1
-            name        = source.unpack_string(name_length)
+            if joliet and name_length > 1:
+                name    = source.unpack_ucs2_string(name_length)
+            else:
+                name    = source.unpack_string(name_length)
             _           = source.unpack_raw(name_length % 2)
 
-            path = []
-            if len(paths_list) > 0:
-                path.extend(paths_list[parent_idx])
-            if name != "\x00":
-                path.append(name)
+            idx = len(self.locations)
+            self.locations.append(location)
+            self.parents.append(parent_idx)
+            if idx > 0:
+                # The root's name is b"\x00", and it can't be looked up by name
+                name = names.setdefault(name, name)
+                self._index.setdefault((parent_idx, name), idx)
+
+    def __len__(self):
+        return len(self.locations)
 
-            paths_list.append(path)
-            self.paths[tuple(path)] = location
+    def index(self, *path):
+        """
+        Returns the entry index for the given path, raising KeyError if there is none.
+        """
+        idx = 0
+        for part in path:
+            idx = self._index[(idx, part)]
+        return idx
 
     def record(self, *path):
-        location = self.paths[path]
+        location = self.locations[self.index(*path)]
         self._source.seek(location)
-        return self._source.unpack_record()
\ No newline at end of file
+        return self._source.unpack_record(joliet=self.joliet)
@@ -1,70 +1,221 @@
+import datetime
+import os
+import struct
+
 from . import susp, rockridge
+from .directory import Directory
+
+# The fixed part of a directory record after its length byte: extended attribute length,
+# location, data length, date, flags, interleave unit size and gap size, volume sequence
+# number and name length. Both-endian fields are read from their little-endian halves;
+# RECORD_HEADER_BE reads the big-endian halves of location, data length and volume sequence.
+RECORD_HEADER = struct.Struct('<BI4xI4x7sBBBH2xB')
+RECORD_HEADER_BE = struct.Struct('>5xI4xI12xHx')
+
+DIR_DATE = struct.Struct('<6Bb')
+
+
+def dir_timestamp(date):
+    """
+    Converts a 7-byte directory record date to seconds since the epoch.
+    """
+    epoch = datetime.datetime(1970, 1, 1)
+    t = list(DIR_DATE.unpack(date))
+    t[0] += 1900
+    t_offset = t.pop(-1) * 15 * 60.    # Offset from GMT in 15min intervals, converted to secs
+    return (datetime.datetime(*t) - epoch).total_seconds() - t_offset
+
+
+def decode_ucs2(data):
+    """
+    Converts a big-endian UCS-2 string, as found in Joliet, to UTF-8 bytes. A trailing odd
+    byte and trailing spaces are dropped.
+    """
+    return data[:len(data) - len(data) % 2].decode('utf-16-be', 'replace').rstrip(' ').encode('utf-8')
+
+
+def _scan_name(buff, offset, end):
+    """
+    Returns the Rock Ridge name of a record from the NM entries in its system use area, from
+    offset to end in buff, walking the entry headers without decoding anything else. Returns
+    b"" if there is no NM entry, and None if part of the name may be in a continuation area,
+    in which case it's left to :func:`Record.name`.
+    """
+    name = b""
+    pending = False
+    continued = False
+    while offset + 4 <= end:
+        signature, length, version = susp.SUSP_HEADER.unpack_from(buff, offset)
+        if length < 4 or offset + length > end:
+            break
+        if signature == b"NM" and version == 1 and length > 4:
+            flags = struct.unpack_from('B', buff, offset + 4)[0]
+            if flags == rockridge.NM.CURRENT:
+                name, pending = name + b".", False
+            elif flags == rockridge.NM.PARENT:
+                name, pending = name + b"..", False
+            elif flags in (0, rockridge.NM.CONTINUE) and length > 5:
+                name += bytes(buff[offset + 5:offset + length])
+                pending = bool(flags & rockridge.NM.CONTINUE)
+            if not pending:
+                return name
+        elif signature == b"CE":
+            continued = True
+        elif signature == b"ST":
+            break
+        offset += length
+    return None if continued else name
+
 
 class Record(object):
-    def __init__(self, source, length, susp_starting_index=None):
+    """
+    A directory record. Only the location, length, flags and name are kept as such; the
+    other fields are decoded when asked for from the buffer of the directory extent the
+    record was parsed from, which the records of a listing share.
+    """
+    __slots__ = ('_source', '_buff', '_offset', '_flags', '_name', '_content', '_extents',
+                 '_susp_entries', 'location', 'length')
+
+    # Set on every record of a file recorded in several extents, but the last
+    MULTI_EXTENT = 0x80
+    # Set in _flags, above the flags byte of the record
+    JOLIET = 0x100
+    # Set in _flags on records shared through the directory cache, which don't keep content
+    LISTED = 0x200
+
+    def __init__(self, source, length, susp_starting_index=None, joliet=False):
         self._source = source
         self._content = None
-        target = source.cursor + length
-
-        _                  = source.unpack('B')       # TODO: extended attributes length
-        self.location      = source.unpack_both('I')
-        self.length        = source.unpack_both('I')
-        self.datetime      = source.unpack_dir_datetime()
-        flags              = source.unpack('B')
-        self.is_hidden     = bool(flags & 1)
-        self.is_directory  = bool(flags & 2)
-        # TODO: other flags
-        _                  = source.unpack('B')       # TODO: interleave unit size
-        _                  = source.unpack('B')       # TODO: interleave gap size
-        _                  = source.unpack_both('h')  # TODO: volume sequence
-        name_length        = source.unpack('B')
-        self.raw_name      = source.unpack_string(name_length).split(b';')[0]
-        if self.raw_name == b"\x00":
-            self.raw_name = b""
-        if name_length % 2 == 0:
-            source.unpack_raw(1) # Parity padding
-
-        # System-use area
-        susp_entries = []
-        if susp_starting_index is None:
-            try_susp = source.unpack_susp(target - source.cursor)
-            if isinstance(try_susp, susp.SP):
-                susp_entries.append(try_susp)
-                if try_susp.len_skp > 7:
-                    susp_starting_index = try_susp.len_skp - 7
-
-        if susp_starting_index is not False:
-            if susp_starting_index:
-                source.unpack_raw(susp_starting_index)
-            while True:
-                try_susp = source.unpack_susp(target - source.cursor)
-                if not try_susp:
-                    break
-                susp_entries.append(try_susp)
-                if isinstance(try_susp, susp.ST):
-                    # "Stop" entry
-                    break
+        self._extents = None
+        self._susp_entries = None
+        self._buff, cursor = source.save_cursor()
+        self._offset = cursor - 1  # The length byte
+        target = cursor + length
 
-        self.embedded_susp_entries = susp_entries
+        # TODO: extended attributes length, interleave unit and gap sizes, volume sequence
+        header = source.unpack_struct(RECORD_HEADER)
+        if source.strict:
+            source.check_both(RECORD_HEADER_BE, (header[1], header[2], header[7]))
+        _, self.location, self.length, _, flags, _, _, _, _ = header
+        self._flags = flags | (Record.JOLIET if joliet else 0)
+        # TODO: other flags
+        source.skip_raw(target - source.cursor)
 
-        assert source.cursor <= target
-        source.unpack_raw(target - source.cursor)
+        self._name = None
+        if susp_starting_index is False:
+            self._name = self.raw_name
+        elif source.rockridge and susp_starting_index is not None:
+            name = _scan_name(self._buff, self._susp_start + susp_starting_index, target)
+            if name is not None:
+                self._name = name or self.raw_name
 
     def __repr__(self):
         return "<Record (%s) name=%r>" % (
             "directory" if self.is_directory else "file",
             self.name)
 
+    @property
+    def _header(self):
+        return RECORD_HEADER.unpack_from(self._buff, self._offset + 1)
+
+    @property
+    def _susp_start(self):
+        name_length = self._header[8]
+        # Names of even length are followed by a padding byte
+        return self._offset + 33 + name_length + 1 - name_length % 2
+
+    @property
+    def joliet(self):
+        return bool(self._flags & Record.JOLIET)
+
+    @property
+    def is_hidden(self):
+        return bool(self._flags & 1)
+
+    @property
+    def is_directory(self):
+        return bool(self._flags & 2)
+
+    @property
+    def extents(self):
+        """
+        The (location, length) of each extent of the file, in order. Files over 4 GiB, in
+        particular, are recorded in several extents, which make up a single record.
+        """
+        if self._extents is None:
+            return [(self.location, self.length)]
+        return list(self._extents)
+
+    def _add_extent(self, record):
+        if self._extents is None:
+            self._extents = [(self.location, self.length)]
+        self._extents.append((record.location, record.length))
+        self.length += record.length
+
+    @property
+    def raw_name(self):
+        """
+        The ISO9660 (or Joliet) name, without its version number.
+        """
+        name_length = self._header[8]
+        start = self._offset + 33
+        name = bytes(self._buff[start:start + name_length])
+        if self.joliet and name_length > 1:
+            name = decode_ucs2(name)
+        else:
+            name = name.rstrip(b' ')
+        name = name.split(b';')[0]
+        return b"" if name == b"\x00" else name
+
+    @property
+    def date_tuple(self):
+        """
+        The recording date as stored: years since 1900, month, day, hour, minute, second and
+        offset from GMT in 15 minute intervals. Cheap to get, for comparing many records.
+        """
+        return DIR_DATE.unpack(self._header[3])
+
+    @property
+    def timestamp(self):
+        """
+        The recording date, in seconds since the epoch.
+        """
+        return dir_timestamp(self._header[3])
+
+    @property
+    def datetime(self):
+        """
+        The recording date as a local time string, e.g. '2016-04-21 01:23:45'.
+        """
+        return datetime.datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
     @property
     def name(self):
-        name = b""
-        for entry in self.susp_entries_unsafe:
-            if not isinstance(entry, rockridge.NM):
-                continue
-            name += entry.name
-            if entry.flags & rockridge.NM.CONTINUE == 0:
-                break
-        return name or self.raw_name
+        if self._name is None:
+            name = b""
+            for entry in self.susp_entries_unsafe:
+                if not isinstance(entry, rockridge.NM):
+                    continue
+                name += entry.name
+                if entry.flags & rockridge.NM.CONTINUE == 0:
+                    break
+            self._name = name or self.raw_name
+        return self._name
+
+    @property
+    def embedded_susp_entries(self):
+        """
+        The SUSP entries in this record's own system use area, decoded from the directory
+        buffer on first access and kept.
+        """
+        if self._susp_entries is None:
+            if self.joliet:
+                self._susp_entries = []
+            else:
+                end = self._offset + struct.unpack_from('B', self._buff, self._offset)[0]
+                self._susp_entries = self._source.unpack_susp_area(
+                    bytes(self._buff[self._susp_start:end]), self._source.susp_starting_index)
+        return self._susp_entries
 
     @property
     def susp_entries_unsafe(self):
@@ -134,23 +285,54 @@ class Record(object):
         """
         assert self.is_directory
         self._source.seek(self.location, self.length)
-        _ = self._source.unpack_record()  # current directory
-        _ = self._source.unpack_record()  # parent directory
+        _ = self._source.unpack_record(self.joliet)  # current directory
+        _ = self._source.unpack_record(self.joliet)  # parent directory
+        multi_extent = None
         while len(self._source) > 0:
-            record = self._source.unpack_record()
+            record = self._source.unpack_record(self.joliet)
 
             if record is None:
                 self._source.unpack_boundary()
                 continue
 
-            yield record
+            # The records for the extents of a file come one after the other: merge them
+            if multi_extent is not None:
+                multi_extent._add_extent(record)
+                if not record._flags & Record.MULTI_EXTENT:
+                    yield multi_extent
+                    multi_extent = None
+            elif record._flags & Record.MULTI_EXTENT:
+                multi_extent = record
+            else:
+                yield record
+
+        if multi_extent is not None:
+            yield multi_extent
 
     @property
     def children(self):
         """
         Assuming this is a directory record, this property contains records for its children.
         """
-        return list(self.children_unsafe)
+        return list(self.listing.entries)
+
+    @property
+    def listing(self):
+        """
+        Assuming this is a directory record, this property is the :class:`Directory` listing
+        its children. Listings are parsed once per directory extent and kept in the source's
+        directory cache, so this does not depend on, or disturb, the source cursor once cached.
+        """
+        assert self.is_directory
+        listing = self._source.dir_cache.get(self.location)
+        if listing is None:
+            saved_cursor = self._source.save_cursor()
+            listing = Directory(self.children_unsafe)
+            self._source.restore_cursor(saved_cursor)
+            for entry in listing:
+                entry._flags |= Record.LISTED
+            self._source.dir_cache.put(self.location, listing)
+        return listing
 
     @property
     def current_directory(self):
@@ -160,7 +342,7 @@ class Record(object):
         """
         assert self.is_directory
         self._source.seek(self.location, self.length)
-        return self._source.unpack_record()  # current directory
+        return self._source.unpack_record(self.joliet)  # current directory
 
     @property
     def parent_directory(self):
@@ -170,27 +352,45 @@ class Record(object):
         """
         assert self.is_directory
         self._source.seek(self.location, self.length)
-        _ = self._source.unpack_record()  # current directory
-        return self._source.unpack_record()  # parent directory
+        _ = self._source.unpack_record(self.joliet)  # current directory
+        return self._source.unpack_record(self.joliet)  # parent directory
 
     @property
     def content(self):
         """
-        Assuming this is a file record, this property contains the file's contents
+        Assuming this is a file record, this property contains the file's contents. Records
+        from a directory listing read it afresh each time, so that cached listings don't hold
+        on to the content of every file read.
         """
         assert not self.is_directory
-        if self._content is None:
-            self._source.seek(self.location, self.length, is_content=True)
-            self._content = self._source.unpack_all()
-        return self._content
+        if self._content is not None:
+            return self._content
+        content = self._source.read_extents(self.extents)
+        if not self._flags & Record.LISTED:
+            self._content = content
+        return content
 
     def get_stream(self):
         """
-        Assuming this is a file record, return a file-like object with a read() method that can be
-        used to sequentially read chunks from the source, along with a close() method.
+        Assuming this is a file record, return a read-only io.RawIOBase stream over its
+        contents, supporting read(), readinto(), seek() and tell(); it can be wrapped in an
+        io.BufferedReader. Streams of remote ISOs can only be read sequentially.
+        """
+        assert not self.is_directory
+        return self._source.get_extents_stream(self.extents)
+
+    def extract(self, path):
+        """
+        Assuming this is a file record, writes its contents to a new file at path, replacing
+        any existing one, and returns the number of bytes written. Content of local ISOs is
+        copied by the kernel (see :func:`source.copy_range`) and never enters Python.
         """
         assert not self.is_directory
-        return self._source.get_stream(self.location, self.length)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            return self._source.copy_extents_to(self.extents, fd)
+        finally:
+            os.close(fd)
 
 
 
@@ -1,4 +1,7 @@
 from __future__ import unicode_literals
+import datetime
+import struct
+
 from .susp import SUSP_Entry, susp_assert
 
 RRIP_109 = ('RRIP_1991A', 1)
@@ -150,19 +153,49 @@ class TF(SUSP_Entry):
     EFFECTIVE  = 64
     LONG_FORM  = 128
 
+    _FIELDS = (
+        (CREATION, 'creation'),
+        (MODIFY, 'modify'),
+        (ACCESS, 'access'),
+        (ATTRIBUTES, 'attributes'),
+        (BACKUP, 'backup'),
+        (EXPIRATION, 'expiration'),
+        (EFFECTIVE, 'effective'),
+    )
+
     def __init__(self, source, ext_id_ver, sig_version, length):
         super(TF, self).__init__(source, ext_id_ver, sig_version, length)
         susp_assert(length >= 1)
         self.flags = source.unpack('B')
-        if self.flags & TF.LONG_FORM:
-            unpack_datetime = source.unpack_vd_datetime
-        else:
-            unpack_datetime = source.unpack_dir_datetime
-
-        self.creation   = unpack_datetime() if self.flags & TF.CREATION else None
-        self.modify     = unpack_datetime() if self.flags & TF.MODIFY else None
-        self.access     = unpack_datetime() if self.flags & TF.ACCESS else None
-        self.attributes = unpack_datetime() if self.flags & TF.ATTRIBUTES else None
-        self.backup     = unpack_datetime() if self.flags & TF.BACKUP else None
-        self.expiration = unpack_datetime() if self.flags & TF.EXPIRATION else None
-        self.effective  = unpack_datetime() if self.flags & TF.EFFECTIVE else None
+
+        # Seconds since the epoch, for the fields present and set
+        self.timestamps = {}
+        for flag, field in TF._FIELDS:
+            value = None
+            if self.flags & flag:
+                if self.flags & TF.LONG_FORM:
+                    value = source.unpack_vd_datetime()
+                    timestamp = vd_timestamp(value)
+                else:
+                    timestamp = source.unpack_dir_timestamp()
+                    value = datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+                if timestamp is not None:
+                    self.timestamps[field] = timestamp
+            setattr(self, field, value)
+
+
+def vd_timestamp(date):
+    """
+    Converts a 17-byte volume descriptor style date to seconds since the epoch, or None if
+    the date is not set.
+    """
+    try:
+        t = [int(date[i:j]) for i, j in ((0, 4), (4, 6), (6, 8), (8, 10), (10, 12), (12, 14))]
+    except ValueError:
+        return None
+    if t[0] == 0:
+        return None
+    hundredths = int(date[14:16])
+    t_offset = struct.unpack('<b', date[16:17])[0] * 15 * 60.
+    epoch = datetime.datetime(1970, 1, 1)
+    return (datetime.datetime(*t) - epoch).total_seconds() + hundredths / 100. - t_offset
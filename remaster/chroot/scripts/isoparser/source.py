@@ -1,10 +1,19 @@
+import bisect
 import datetime
+import errno
+import io
+import mmap
+import os
+import re
+import socket
 import struct
+import threading
 
-from six.moves.urllib import request
-from six.moves import range
+from six.moves import http_client, range
+from six.moves.urllib.parse import urlsplit
 
 from . import path_table, record, volume_descriptors, susp
+from .cache import LockedCache, LRUCache, SectorCache
 
 
 SECTOR_LENGTH = 2048
@@ -14,16 +23,146 @@ class SourceError(Exception):
     pass
 
 
+def pread(file, size, offset):
+    """
+    Reads up to size bytes at offset without using or moving the file position, so that
+    threads sharing the file don't interfere. Falls back to seek() and read() where
+    os.pread is unavailable.
+    """
+    if not hasattr(os, "pread"):
+        file.seek(offset)
+        return file.read(size)
+    chunks = []
+    while size > 0:
+        data = os.pread(file.fileno(), size, offset)
+        if not data:
+            break
+        chunks.append(data)
+        size -= len(data)
+        offset += len(data)
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+
+def preadinto(file, view, offset):
+    """
+    Reads into a writable memoryview at offset, as :func:`pread` does, without an
+    intermediate copy where os.preadv is available. Returns the number of bytes read.
+    """
+    if not hasattr(os, "preadv"):
+        data = pread(file, len(view), offset)
+        view[:len(data)] = data
+        return len(data)
+    total = 0
+    while total < len(view):
+        n = os.preadv(file.fileno(), [view[total:]], offset + total)
+        if not n:
+            break
+        total += n
+    return total
+
+
+# Errors from os.copy_file_range and os.sendfile meaning that the files can't be copied
+# between this way, as opposed to I/O errors
+_NO_KERNEL_COPY = frozenset(getattr(errno, name) for name in (
+    "EXDEV", "ENOSYS", "EINVAL", "EOPNOTSUPP", "ENOTSUP", "EBADF", "ETXTBSY")
+    if hasattr(errno, name))
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def copy_range(file, offset, length, dst_fd):
+    """
+    Copies length bytes at offset in file to the current position of dst_fd, without
+    passing the data through Python objects where possible: os.copy_file_range first (which
+    shares the extents as a reflink on filesystems supporting it), then os.sendfile, then a
+    loop of preads into a single reused buffer. The position of file is left alone. Returns
+    the number of bytes copied, which is short only if file ends first.
+    """
+    src_fd = file.fileno()
+    copied = 0
+    for kernel_copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if kernel_copy is None:
+            continue
+        try:
+            while copied < length:
+                if kernel_copy is os.sendfile:
+                    n = os.sendfile(dst_fd, src_fd, offset + copied, length - copied)
+                else:
+                    n = os.copy_file_range(src_fd, dst_fd, length - copied, offset + copied)
+                if not n:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _NO_KERNEL_COPY:
+                raise
+
+    buff = memoryview(bytearray(min(COPY_BUFFER_SIZE, length - copied)))
+    while copied < length:
+        view = buff[:min(len(buff), length - copied)]
+        n = preadinto(file, view, offset + copied)
+        if not n:
+            break
+        _write_all(dst_fd, view[:n])
+        copied += n
+    return copied
+
+
+def _write_all(fd, view):
+    while len(view):
+        view = view[os.write(fd, view):]
+
+
+def coalesce(extents):
+    """
+    Merges (sector, length) extents that follow each other on the medium, so that they are
+    read in one go. Only an extent filling its last sector can be merged with the next.
+    """
+    runs = []
+    for sector, length in extents:
+        if runs and runs[-1][1] % SECTOR_LENGTH == 0 and \
+                runs[-1][0] + runs[-1][1] // SECTOR_LENGTH == sector:
+            runs[-1][1] += length
+        else:
+            runs.append([sector, length])
+    return [tuple(run) for run in runs]
+
+
+def assemble(pieces, length):
+    """
+    Joins a list of byte strings into a single one of at most length bytes. Pieces wholly past
+    length are dropped beforehand, so at most one copy of the data is made, and a single piece
+    that is already the right size is returned as is.
+    """
+    total = sum(len(piece) for piece in pieces)
+    while pieces and total - len(pieces[-1]) >= length:
+        total -= len(pieces.pop())
+    if len(pieces) == 1:
+        return pieces[0][:length] if total > length else pieces[0]
+    if total > length:
+        pieces[-1] = pieces[-1][:len(pieces[-1]) - (total - length)]
+    return b"".join(pieces)
+
+
 class Source(object):
-    def __init__(self, cache_content=False, min_fetch=16):
+    # Whether several threads may use this source at once
+    thread_safe = False
+
+    def __init__(self, cache_content=False, min_fetch=16, max_fetch=256, cache=None,
+                 cache_size=None, dir_cache_size=1024, strict=False):
         self._buff = None
-        self._sectors = {}
+        self.cache = cache if cache is not None else SectorCache(cache_size)
+        self.dir_cache = LRUCache(dir_cache_size)
         self.cursor = None
         self.cache_content = cache_content
         self.min_fetch = min_fetch
+        self.max_fetch = max(min_fetch, max_fetch)
+        self.fetch_window = min_fetch
+        self._last_seek = None
         self.susp_starting_index = None
         self.susp_extensions = []
         self.rockridge = False
+        self.strict = strict
 
     def __len__(self):
         return len(self._buff) - self.cursor
@@ -40,6 +179,11 @@ class Source(object):
         self.cursor += l
         return data
 
+    def skip_raw(self, l):
+        if l > len(self):
+            raise SourceError("Source buffer under-run")
+        self.cursor += l
+
     def unpack_all(self):
         return self.unpack_raw(len(self))
 
@@ -49,13 +193,39 @@ class Source(object):
     def unpack_both(self, st):
         a = self.unpack('<'+st)
         b = self.unpack('>'+st)
-        if a != b:
+        if self.strict and a != b:
             raise SourceError("Both-endian value mismatch")
         return a
 
+    def unpack_struct(self, st):
+        """
+        Unpacks a precompiled struct.Struct straight off the buffer, returning the tuple.
+        """
+        if st.size > len(self):
+            raise SourceError("Source buffer under-run")
+        values = st.unpack_from(self._buff, self.cursor)
+        self.cursor += st.size
+        return values
+
+    def check_both(self, st, values):
+        """
+        Checks the big-endian halves of both-endian fields just unpacked by unpack_struct().
+        st unpacks those halves, in order, from the same bytes, and values are the
+        little-endian ones.
+        """
+        if st.unpack_from(self._buff, self.cursor - st.size) != tuple(values):
+            raise SourceError("Both-endian value mismatch")
+
     def unpack_string(self, l):
         return self.unpack_raw(l).rstrip(b' ')
 
+    def unpack_ucs2_string(self, l):
+        """
+        Unpacks a big-endian UCS-2 string, as found in Joliet, and returns it as UTF-8 bytes.
+        A trailing odd byte is ignored.
+        """
+        return record.decode_ucs2(self.unpack_raw(l))
+
     def unpack(self, st):
         if st[0] not in '<>':
             st = '<' + st
@@ -71,16 +241,14 @@ class Source(object):
     def unpack_vd_datetime(self):
         return self.unpack_raw(17)  # TODO
 
+    def unpack_dir_timestamp(self):
+        """
+        Unpacks a 7-byte directory record date as seconds since the epoch.
+        """
+        return record.dir_timestamp(self.unpack_raw(7))
+
     def unpack_dir_datetime(self):
-        epoch = datetime.datetime(1970, 1, 1)
-        date = self.unpack_raw(7)
-        t = [struct.unpack('<B', bytes([i]) if isinstance(i, int) else i)[0]
-             for i in date]
-        t.append(struct.unpack('<b', date[-1:])[0])
-        t[0] += 1900
-        t_offset = t.pop(-1) * 15 * 60.    # Offset from GMT in 15min intervals, converted to secs
-        t_timestamp = (datetime.datetime(*t) - epoch).total_seconds() - t_offset
-        t_datetime = datetime.datetime.fromtimestamp(t_timestamp)
+        t_datetime = datetime.datetime.fromtimestamp(self.unpack_dir_timestamp())
         t_readable = t_datetime.strftime('%Y-%m-%d %H:%M:%S')
         return t_readable
 
@@ -108,16 +276,20 @@ class Source(object):
             raise SourceError("Unknown volume descriptor type: %d" % ty)
         return vd
 
-    def unpack_path_table(self):
-        return path_table.PathTable(self)
+    def unpack_path_table(self, joliet=False):
+        return path_table.PathTable(self, joliet)
 
-    def unpack_record(self):
+    def unpack_record(self, joliet=False):
         start_cursor = self.cursor
         length = self.unpack('B')
         if length == 0:
             self.rewind('B')
             return None
-        new_record = record.Record(self, length-1, self.susp_starting_index)
+        if joliet:
+            # The Joliet hierarchy carries no SUSP entries
+            new_record = record.Record(self, length-1, False, joliet=True)
+        else:
+            new_record = record.Record(self, length-1, self.susp_starting_index)
         assert self.cursor == start_cursor + length
         return new_record
 
@@ -125,9 +297,8 @@ class Source(object):
         if maxlen < 4:
             return None
         start_cursor = self.cursor
-        signature = self.unpack_raw(2).decode()
-        length = self.unpack('B')
-        version = self.unpack('B')
+        signature, length, version = self.unpack_struct(susp.SUSP_HEADER)
+        signature = signature.decode()
         if maxlen < length:
             self.rewind_raw(4)
             return None
@@ -147,37 +318,134 @@ class Source(object):
         assert self.cursor == start_cursor + length
         return new_susp
 
+    def unpack_susp_area(self, data, starting_index=None):
+        """
+        Decodes the SUSP entries of a record's system use area, given as bytes. The current
+        buffer and cursor are left untouched.
+        """
+        saved_cursor = self.save_cursor()
+        self._buff = data
+        self.cursor = 0
+        entries = []
+        try:
+            if starting_index is None:
+                try_susp = self.unpack_susp(len(self))
+                if isinstance(try_susp, susp.SP):
+                    entries.append(try_susp)
+                    if try_susp.len_skp > 7:
+                        starting_index = try_susp.len_skp - 7
+
+            if starting_index is not False:
+                if starting_index:
+                    self.unpack_raw(starting_index)
+                while True:
+                    try_susp = self.unpack_susp(len(self))
+                    if not try_susp:
+                        break
+                    entries.append(try_susp)
+                    if isinstance(try_susp, susp.ST):
+                        # "Stop" entry
+                        break
+        finally:
+            self.restore_cursor(saved_cursor)
+        return entries
+
     def seek(self, start_sector, length=SECTOR_LENGTH, is_content=False):
         self.cursor = 0
-        self._buff = b""
         do_caching = (not is_content or self.cache_content)
         n_sectors = 1 + (length - 1) // SECTOR_LENGTH
-        fetch_sectors = max(self.min_fetch, n_sectors) if do_caching else n_sectors
+        if do_caching:
+            fetch_sectors = max(self._read_ahead(start_sector, n_sectors), n_sectors)
+        else:
+            fetch_sectors = n_sectors
         need_start = None
+        pieces = []
 
         def fetch_needed(need_count):
             data = self._fetch(need_start, need_count)
-            self._buff += data
+            self._count_fetched(len(data))
+            pieces.append(data)
             if do_caching:
-                for sector_idx in range(need_count):
-                    self._sectors[need_start + sector_idx] = data[sector_idx*SECTOR_LENGTH:(sector_idx+1)*SECTOR_LENGTH]
+                self._store(need_start, data)
 
+        cached = 0
         for sector in range(start_sector, start_sector + fetch_sectors):
-            if sector in self._sectors:
+            if sector < start_sector + n_sectors:
+                data = self.cache.get(sector)
+                cached += data is not None
+            elif cached == n_sectors:
+                # Everything needed was cached: don't do I/O just to read ahead
+                break
+            else:
+                # Read-ahead sectors: only probe, so as not to skew the statistics or LRU order
+                data = True if sector in self.cache else None
+            if data is not None:
                 if need_start is not None:
                     fetch_needed(sector - need_start)
                     need_start = None
                 # If we've gotten past the sectors we actually need, don't continue to fetch
                 if sector >= start_sector + n_sectors:
                     break
-                self._buff += self._sectors[sector]
+                pieces.append(data)
             elif need_start is None:
                 need_start = sector
 
         if need_start is not None:
             fetch_needed(start_sector + fetch_sectors - need_start)
 
-        self._buff = self._buff[:length]
+        self._buff = assemble(pieces, length)
+
+    def _read_ahead(self, start_sector, n_sectors):
+        """
+        Returns the number of sectors to fetch for a seek. The window doubles (up to
+        max_fetch) while each seek starts at, or shortly after, the end of the previous one,
+        and halves (down to min_fetch) when it jumps elsewhere. Re-seeking the same sector
+        leaves it unchanged.
+        """
+        if self._last_seek is not None:
+            last_start, last_end = self._last_seek
+            if last_end <= start_sector <= last_end + self.fetch_window:
+                self.fetch_window = min(self.fetch_window * 2, self.max_fetch)
+            elif start_sector != last_start:
+                self.fetch_window = max(self.fetch_window // 2, self.min_fetch)
+        self._last_seek = (start_sector, start_sector + n_sectors)
+        return self.fetch_window
+
+    def _count_fetched(self, nbytes):
+        self.cache.stats.bytes_fetched += nbytes
+
+    def _store(self, sector, data):
+        for sector_idx in range(len(data) // SECTOR_LENGTH):
+            self.cache.put(sector + sector_idx, data[sector_idx*SECTOR_LENGTH:(sector_idx+1)*SECTOR_LENGTH])
+
+    def prefetch(self, extents):
+        """
+        Loads the sectors backing the given (start_sector, length) extents into the sector
+        cache, whatever their kind, so that later seeks to them need no I/O. The sectors not
+        already cached are fetched as a single batch, which sources that can (e.g.
+        HTTPSource) turn into a single request.
+        """
+        wanted = set()
+        for start_sector, length in extents:
+            n_sectors = 1 + (max(length, 1) - 1) // SECTOR_LENGTH
+            wanted.update(range(start_sector, start_sector + n_sectors))
+        runs = []
+        for sector in sorted(sec for sec in wanted if sec not in self.cache):
+            if runs and runs[-1][0] + runs[-1][1] == sector:
+                runs[-1][1] += 1
+            else:
+                runs.append([sector, 1])
+        if not runs:
+            return
+        for (sector, _), data in zip(runs, self._fetch_many(runs)):
+            self._count_fetched(len(data))
+            self._store(sector, data)
+
+    def _fetch_many(self, runs):
+        """
+        Returns the data for each of the given (sector, count) runs.
+        """
+        return [self._fetch(sector, count) for sector, count in runs]
 
     def save_cursor(self):
         return (self._buff, self.cursor)
@@ -191,29 +459,187 @@ class Source(object):
     def get_stream(self, sector, length):
         raise NotImplementedError
 
+    def read_extents(self, extents):
+        """
+        Returns the content of a file made of the given (sector, length) extents.
+        """
+        pieces = []
+        for sector, length in coalesce(extents):
+            self.seek(sector, length, is_content=True)
+            pieces.append(self.unpack_all())
+        return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+    def get_extents_stream(self, extents):
+        """
+        Returns a stream over the content of a file made of the given (sector, length)
+        extents.
+        """
+        runs = coalesce(extents)
+        if len(runs) == 1:
+            return self.get_stream(*runs[0])
+        return ExtentStream(self, runs)
+
+    def copy_extents_to(self, extents, dst_fd):
+        """
+        Writes the content of a file made of the given (sector, length) extents to dst_fd,
+        as copy_to() does, and returns the number of bytes written.
+        """
+        return sum(self.copy_to(sector, length, dst_fd) for sector, length in coalesce(extents))
+
+    def copy_to(self, sector, length, dst_fd):
+        """
+        Writes length bytes of content starting at sector to the current position of the
+        file descriptor dst_fd, and returns the number of bytes written.
+        """
+        stream = self.get_stream(sector, length)
+        try:
+            buff = memoryview(bytearray(min(COPY_BUFFER_SIZE, length) or 1))
+            copied = 0
+            while copied < length:
+                n = stream.readinto(buff)
+                if not n:
+                    break
+                _write_all(dst_fd, buff[:n])
+                copied += n
+        finally:
+            stream.close()
+        if copied < length:
+            raise SourceError("Source truncated")
+        return copied
+
     def close(self):
         pass
 
 
-class FileStream(object):
-    def __init__(self, file, offset, length):
-        self._file = file
-        self._offset = offset
+class ContentStream(io.RawIOBase):
+    """
+    Base class for the streams returned by get_stream(): a read-only, seekable raw stream
+    over length bytes of content, which io.BufferedReader can wrap. Subclasses implement
+    _read(size) and _readinto(view), reading at self.cur_offset.
+    """
+    def __init__(self, length):
+        super(ContentStream, self).__init__()
         self._length = length
         self.cur_offset = 0
 
-    def read(self, *args):
-        size = args[0] if args else -1
-        self._file.seek(self._offset + self.cur_offset)
-        if size < 0 or size > self._length - self.cur_offset:
-            size = self._length - self.cur_offset
-        data = self._file.read(size)
-        if data:
-            self.cur_offset += len(data)
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.cur_offset
+        elif whence == io.SEEK_END:
+            offset += self._length
+        elif whence != io.SEEK_SET:
+            raise ValueError("Invalid whence: %r" % whence)
+        if offset < 0:
+            raise ValueError("Negative seek position %d" % offset)
+        self.cur_offset = offset
+        return offset
+
+    def tell(self):
+        return self.cur_offset
+
+    def _remaining(self, size):
+        remaining = max(self._length - self.cur_offset, 0)
+        if size is None or size < 0 or size > remaining:
+            return remaining
+        return size
+
+    def read(self, size=-1):
+        data = self._read(self._remaining(size))
+        self.cur_offset += len(data)
         return data
 
+    def readall(self):
+        return self.read()
+
+    def readinto(self, b):
+        view = memoryview(b).cast('B')
+        size = self._remaining(len(view))
+        n = self._readinto(view[:size]) if size else 0
+        self.cur_offset += n
+        return n
+
+
+class FileStream(ContentStream):
+    def __init__(self, file, offset, length):
+        super(FileStream, self).__init__(length)
+        self._file = file
+        self._offset = offset
+
+    def _read(self, size):
+        return pread(self._file, size, self._offset + self.cur_offset)
+
+    def _readinto(self, view):
+        return preadinto(self._file, view, self._offset + self.cur_offset)
+
+
+class ExtentStream(ContentStream):
+    """
+    A stream over the content of a file made of several runs of sectors, reading each run
+    through a stream from the source's get_stream(). Seeking is only possible if those
+    streams can seek.
+    """
+    def __init__(self, source, runs):
+        super(ExtentStream, self).__init__(sum(length for _, length in runs))
+        self._source = source
+        self._runs = runs
+        self._starts = []
+        start = 0
+        for _, length in runs:
+            self._starts.append(start)
+            start += length
+        self._part = None
+        self._part_idx = None
+
+    def _part_at(self, offset):
+        """
+        Returns the stream for the run holding offset, positioned there, and the number of
+        bytes left in that run.
+        """
+        idx = bisect.bisect_right(self._starts, offset) - 1
+        if idx != self._part_idx:
+            if self._part is not None:
+                self._part.close()
+            self._part = self._source.get_stream(*self._runs[idx])
+            self._part_idx = idx
+        local_offset = offset - self._starts[idx]
+        if self._part.cur_offset != local_offset:
+            self._part.seek(local_offset)
+        return self._part, self._runs[idx][1] - local_offset
+
+    def _read(self, size):
+        pieces = []
+        offset = self.cur_offset
+        while size > 0:
+            part, left = self._part_at(offset)
+            data = part.read(min(size, left))
+            if not data:
+                break
+            pieces.append(data)
+            offset += len(data)
+            size -= len(data)
+        return pieces[0] if len(pieces) == 1 else b"".join(pieces)
+
+    def _readinto(self, view):
+        done = 0
+        while done < len(view):
+            part, left = self._part_at(self.cur_offset + done)
+            n = part.readinto(view[done:done + min(len(view) - done, left)])
+            if not n:
+                break
+            done += n
+        return done
+
     def close(self):
-        pass
+        if self._part is not None:
+            self._part.close()
+            self._part = None
+        super(ExtentStream, self).close()
 
 
 class FileSource(Source):
@@ -222,28 +648,449 @@ class FileSource(Source):
         self._file = open(path, 'rb')
 
     def _fetch(self, sector, count=1):
-        self._file.seek(sector*SECTOR_LENGTH)
-        return self._file.read(SECTOR_LENGTH*count)
+        return pread(self._file, SECTOR_LENGTH*count, sector*SECTOR_LENGTH)
 
     def get_stream(self, sector, length):
         return FileStream(self._file, sector*SECTOR_LENGTH, length)
 
+    def copy_to(self, sector, length, dst_fd):
+        copied = copy_range(self._file, sector*SECTOR_LENGTH, length, dst_fd)
+        if copied < length:
+            raise SourceError("Source truncated")
+        return copied
+
     def close(self):
         self._file.close()
 
 
+class BufferStream(ContentStream):
+    """
+    A stream over an in-memory buffer. read() returns bytes, as io.RawIOBase requires;
+    readinto() copies straight from the buffer into the caller's.
+    """
+    def __init__(self, view):
+        super(BufferStream, self).__init__(len(view))
+        self._view = view
+
+    def _read(self, size):
+        return bytes(self._view[self.cur_offset:self.cur_offset + size])
+
+    def _readinto(self, view):
+        view[:] = self._view[self.cur_offset:self.cur_offset + len(view)]
+        return len(view)
+
+
+class MmapFileSource(FileSource):
+    """
+    A FileSource that maps the whole ISO into memory. seek() slices the mapping instead of
+    reading and copying sectors, so no sector cache is kept. Record.content hands out
+    memoryview slices of the mapping, and get_stream() streams readinto() straight from
+    it; metadata fields are still returned as bytes.
+    """
+    def __init__(self, path, **kwargs):
+        super(MmapFileSource, self).__init__(path, **kwargs)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def seek(self, start_sector, length=SECTOR_LENGTH, is_content=False):
+        offset = start_sector * SECTOR_LENGTH
+        self.cursor = 0
+        self._buff = self._view[offset:offset + length]
+
+    def unpack_raw(self, l):
+        return super(MmapFileSource, self).unpack_raw(l).tobytes()
+
+    def unpack_susp_area(self, data, starting_index=None):
+        return super(MmapFileSource, self).unpack_susp_area(memoryview(data), starting_index)
+
+    def unpack_all(self):
+        # Skip the bytes conversion: content is served straight from the mapping
+        return Source.unpack_raw(self, len(self))
+
+    def _fetch(self, sector, count=1):
+        offset = sector * SECTOR_LENGTH
+        return self._view[offset:offset + SECTOR_LENGTH*count]
+
+    def prefetch(self, extents):
+        pass
+
+    def get_stream(self, sector, length):
+        offset = sector * SECTOR_LENGTH
+        return BufferStream(self._view[offset:offset + length])
+
+    def close(self):
+        self._buff = None
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Content views handed out to callers are still alive; the mapping is
+            # unmapped once the last of them is garbage collected.
+            pass
+        super(MmapFileSource, self).close()
+
+
+class _ReaderState(threading.local):
+    def __init__(self, min_fetch):
+        self.buff = None
+        self.cursor = None
+        self.fetch_window = min_fetch
+        self.last_seek = None
+
+
+def _reader_attr(name):
+    return property(lambda self: getattr(self._reader, name),
+                    lambda self, value: setattr(self._reader, name, value))
+
+
+class ThreadSafeMixin(object):
+    """
+    Makes a source usable from several threads at once. The buffer and cursor that seek()
+    and the unpack methods work on, along with the read-ahead state, are kept per thread, so
+    each thread is a reader with its own cursor; the sector cache is shared, behind a lock.
+    The underlying reads must not depend on a shared file position (see :func:`pread`).
+    """
+    thread_safe = True
+
+    _buff = _reader_attr("buff")
+    cursor = _reader_attr("cursor")
+    fetch_window = _reader_attr("fetch_window")
+    _last_seek = _reader_attr("last_seek")
+
+    def __init__(self, *args, **kwargs):
+        self._reader = _ReaderState(kwargs.get("min_fetch", 16))
+        super(ThreadSafeMixin, self).__init__(*args, **kwargs)
+        self.cache = LockedCache(self.cache)
+        self.dir_cache = LockedCache(self.dir_cache)
+
+    def _count_fetched(self, nbytes):
+        with self.cache.lock:
+            super(ThreadSafeMixin, self)._count_fetched(nbytes)
+
+
+class ThreadSafeFileSource(ThreadSafeMixin, FileSource):
+    pass
+
+
+class ThreadSafeMmapFileSource(ThreadSafeMixin, MmapFileSource):
+    pass
+
+
+class HTTPStream(io.RawIOBase):
+    """
+    The body of a single range request, as a raw stream that can only be read sequentially.
+    Once the body has been read in full, the connection goes back to its pool for reuse;
+    closing the stream early drops the connection instead.
+    """
+    def __init__(self, pool, conn, response, length, reusable=True):
+        super(HTTPStream, self).__init__()
+        self._pool = pool
+        self._conn = conn
+        self._response = response
+        self._length = length
+        self._reusable = reusable
+        self.cur_offset = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._length - self.cur_offset:
+            size = self._length - self.cur_offset
+        data = self._response.read(size) if size else b""
+        self.cur_offset += len(data)
+        if len(data) < size:
+            raise SourceError("HTTP response truncated")
+        if self.cur_offset == self._length:
+            self._finish()
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, b):
+        view = memoryview(b).cast('B')
+        size = min(len(view), self._length - self.cur_offset)
+        n = self._response.readinto(view[:size]) if size else 0
+        self.cur_offset += n
+        if n < size:
+            raise SourceError("HTTP response truncated")
+        if self.cur_offset == self._length:
+            self._finish()
+        return n
+
+    def _finish(self):
+        if self._conn is not None:
+            if not self._reusable or self._response.will_close or not self._response.isclosed():
+                # Server won't keep the connection open, or there is unread body left
+                self._conn.close()
+            else:
+                self._pool.release(self._conn)
+            self._conn = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        super(HTTPStream, self).close()
+
+
+class HTTPConnectionPool(object):
+    """
+    A small pool of persistent HTTP/1.1 connections to the host serving an ISO. Keeps counts
+    of the connections opened and requests sent, to make round trips visible.
+    """
+    CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+    BOUNDARY = re.compile(r"boundary=\"?([^\";]+)")
+
+    def __init__(self, url, size=4, timeout=60):
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            self._conn_class = http_client.HTTPSConnection
+        else:
+            self._conn_class = http_client.HTTPConnection
+        self.host = parts.netloc
+        self.path = parts.path + ("?" + parts.query if parts.query else "")
+        self.size = size
+        self.timeout = timeout
+        self.multirange = True
+        self.connections = 0
+        self.requests = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.connections += 1
+        return self._conn_class(self.host, timeout=self.timeout)
+
+    def release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, headers=None):
+        """
+        Sends a request for the ISO and returns (connection, response). A pooled connection
+        that the server has since closed is replaced by a fresh one.
+        """
+        conn = self.acquire()
+        for attempt in (0, 1):
+            with self._lock:
+                self.requests += 1
+            try:
+                conn.request(method, self.path, headers=headers or {})
+                return conn, conn.getresponse()
+            except (http_client.HTTPException, socket.error):
+                conn.close()
+                if attempt:
+                    raise
+                with self._lock:
+                    self.connections += 1
+                conn = self._conn_class(self.host, timeout=self.timeout)
+
+    def get_range(self, offset, length):
+        """
+        Returns an :class:`HTTPStream` over length bytes of the ISO starting at offset.
+        """
+        conn, response = self.request("GET", {
+            "Range": "bytes=%d-%d" % (offset, offset + length - 1)})
+        if response.status == 206:
+            match = self.CONTENT_RANGE.match(response.getheader("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                conn.close()
+                raise SourceError("Unexpected Content-Range: %r" % response.getheader("Content-Range"))
+            # The range may have been cut short at the end of the ISO
+            length = min(length, int(match.group(2)) - offset + 1)
+            return HTTPStream(self, conn, response, length)
+        elif response.status == 200:
+            # Range not supported: skip up to the offset, then drop the connection when done
+            total = response.getheader("Content-Length")
+            if total is not None:
+                length = max(0, min(length, int(total) - offset))
+            skip = offset
+            while skip:
+                data = response.read(min(skip, 1 << 20))
+                if not data:
+                    break
+                skip -= len(data)
+            return HTTPStream(self, conn, response, length, reusable=False)
+        else:
+            response.read()
+            self.release(conn)
+            raise SourceError("HTTP %d %s" % (response.status, response.reason))
+
+    def get_ranges(self, ranges):
+        """
+        Requests several (offset, length) ranges in one multipart/byteranges request. Returns
+        a dict mapping the offset of each range the response covered to its data. A server
+        that answers with the whole ISO instead is not read from, and is not asked again.
+        """
+        conn, response = self.request("GET", {"Range": "bytes=" + ",".join(
+            "%d-%d" % (offset, offset + length - 1) for offset, length in ranges)})
+        if response.status != 206:
+            conn.close()
+            self.multirange = False
+            return {}
+        content_type = response.getheader("Content-Type", "")
+        if content_type.startswith("multipart/byteranges"):
+            match = self.BOUNDARY.search(content_type)
+            if not match:
+                conn.close()
+                raise SourceError("No boundary in %r" % content_type)
+            parts = self._parse_multipart(response.read(), match.group(1).encode())
+        else:
+            # The server merged the ranges into a single one
+            match = self.CONTENT_RANGE.match(response.getheader("Content-Range", ""))
+            if not match:
+                conn.close()
+                raise SourceError("Unexpected Content-Range: %r" % response.getheader("Content-Range"))
+            parts = [(int(match.group(1)), response.read(), match.group(3))]
+        if response.will_close:
+            conn.close()
+        else:
+            self.release(conn)
+
+        results = {}
+        for offset, length in ranges:
+            for start, data, total in parts:
+                if start <= offset < start + len(data):
+                    chunk = data[offset - start:offset - start + length]
+                    if len(chunk) == length or total == str(start + len(data)):
+                        results[offset] = chunk
+                    break
+        return results
+
+    def _parse_multipart(self, body, boundary):
+        """
+        Splits a multipart/byteranges body into (start, data, total) tuples.
+        """
+        parts = []
+        delimiter = b"--" + boundary
+        pos = body.find(delimiter)
+        while pos >= 0 and body[pos + len(delimiter):pos + len(delimiter) + 2] != b"--":
+            header_end = body.find(b"\r\n\r\n", pos)
+            if header_end < 0:
+                break
+            match = self.CONTENT_RANGE.search(body[pos:header_end].decode("latin-1"))
+            if not match:
+                raise SourceError("Multipart response part without Content-Range")
+            start, end = int(match.group(1)), int(match.group(2))
+            data_start = header_end + 4
+            parts.append((start, body[data_start:data_start + end - start + 1], match.group(3)))
+            pos = body.find(delimiter, data_start + end - start + 1)
+        return parts
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
 class HTTPSource(Source):
-    def __init__(self, url, **kwargs):
+    # Many servers refuse requests with more ranges than this
+    MAX_RANGES = 64
+
+    def __init__(self, url, pool_size=4, disk_cache=None, **kwargs):
         super(HTTPSource, self).__init__(**kwargs)
         self._url = url
+        self.pool = HTTPConnectionPool(url, pool_size)
+        self._disk_entry = None
+        if disk_cache is not None:
+            self._open_disk_cache(disk_cache)
+
+    def _open_disk_cache(self, disk_cache):
+        conn, response = self.pool.request("HEAD")
+        response.read()
+        self.pool.release(conn)
+        length = response.getheader("Content-Length")
+        version = response.getheader("ETag") or response.getheader("Last-Modified")
+        if response.status != 200 or length is None or not version:
+            # Without a length and a version the ISO can't be told apart from a changed one
+            return
+        self._disk_entry = disk_cache.open(self._url, version, int(length), SECTOR_LENGTH)
 
     def _fetch(self, sector, count=1):
-        return self.get_stream(sector, count*SECTOR_LENGTH).read()
+        return self._fetch_many([(sector, count)])[0]
+
+    def _fetch_many(self, runs):
+        """
+        Serves the runs from the on-disk cache, if any, downloading only the sectors it is
+        missing and adding them to it.
+        """
+        if self._disk_entry is None:
+            return self._download(runs)
+        split_runs = [self._disk_entry.runs(sector, count) for sector, count in runs]
+        missing = [(s, c) for pieces in split_runs for s, c, present in pieces if not present]
+        downloaded = dict(zip(missing, self._download(missing))) if missing else {}
+        for (sector, _), data in downloaded.items():
+            self._disk_entry.write(sector, data)
+        return [b"".join(self._disk_entry.read(s, c) if present else downloaded[(s, c)]
+                         for s, c, present in pieces)
+                for pieces in split_runs]
+
+    def _download(self, runs):
+        """
+        Fetches the runs with multipart range requests, falling back to concurrent single
+        range requests for whatever the server did not (or would not) return that way.
+        """
+        if len(runs) == 1:
+            sector, count = runs[0]
+            return [self.get_stream(sector, count*SECTOR_LENGTH).read()]
+        ranges = [(sector * SECTOR_LENGTH, count * SECTOR_LENGTH) for sector, count in runs]
+        results = {}
+        for idx in range(0, len(ranges), self.MAX_RANGES):
+            if not self.pool.multirange:
+                break
+            results.update(self.pool.get_ranges(ranges[idx:idx + self.MAX_RANGES]))
+        missing = [r for r in ranges if r[0] not in results]
+        if missing:
+            results.update(self._fetch_parallel(missing))
+        return [results[offset] for offset, _ in ranges]
+
+    def _fetch_parallel(self, ranges):
+        """
+        Fetches (offset, length) ranges using up to pool.size concurrent connections and
+        returns a dict mapping offsets to data.
+        """
+        results = {}
+        errors = []
+        pending = list(ranges)
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not pending or errors:
+                        return
+                    offset, length = pending.pop()
+                try:
+                    data = self.pool.get_range(offset, length).read()
+                except Exception as e:
+                    errors.append(e)
+                    return
+                results[offset] = data
+
+        threads = [threading.Thread(target=worker) for _ in range(min(self.pool.size, len(ranges)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return results
 
     def get_stream(self, sector, length):
-        opener = request.FancyURLopener()
-        opener.http_error_206 = lambda *a, **k: None
-        opener.addheader("Range", "bytes=%d-%d" % (
-            SECTOR_LENGTH * sector,
-            SECTOR_LENGTH * sector + length - 1))
-        return opener.open(self._url)
+        if length == 0:
+            return BufferStream(b"")
+        return self.pool.get_range(SECTOR_LENGTH * sector, length)
+
+    def close(self):
+        self.pool.close()
+        if self._disk_entry is not None:
+            self._disk_entry.close()
@@ -1,5 +1,10 @@
+import struct
+
 from six import add_metaclass, iteritems
 
+# Signature, length and version of a SUSP entry
+SUSP_HEADER = struct.Struct('<2sBB')
+
 class SUSPError(Exception):
     pass
 
@@ -8,22 +8,42 @@ class VolumeDescriptor(object):
         return "<VolumeDescriptor name=%r>" % self.name
 
 
+EL_TORITO = b"EL TORITO SPECIFICATION"
+
+
 class BootVD(VolumeDescriptor):
+    """
+    A boot record. For El Torito, catalog_location is the sector of the boot catalog; it is
+    None for other boot systems.
+    """
     name = "boot"
 
+    def __init__(self, source):
+        super(BootVD, self).__init__(source)
+
+        self.boot_system_identifier        = source.unpack_raw(32).rstrip(b"\x00 ")
+        self.boot_identifier               = source.unpack_raw(32).rstrip(b"\x00 ")
+        self.catalog_location              = None
+        if self.boot_system_identifier == EL_TORITO:
+            self.catalog_location          = source.unpack('<I')
+
+
+JOLIET_ESCAPES = (b"%/@", b"%/C", b"%/E")
+
 
 class PrimaryVD(VolumeDescriptor):
     name = "primary"
+    joliet = False
 
     def __init__(self, source):
         super(PrimaryVD, self).__init__(source)
 
-        _                                  = source.unpack_raw(1)     # unused
-        self.system_identifier             = source.unpack_string(32)
-        self.volume_identifier             = source.unpack_string(32)
+        self.volume_flags                  = source.unpack('B')       # unused in the primary VD
+        self.system_identifier             = self.unpack_identifier(source, 32)
+        self.volume_identifier             = self.unpack_identifier(source, 32)
         _                                  = source.unpack_raw(8)     # unused
         self.volume_space_size             = source.unpack_both('i')
-        _                                  = source.unpack_raw(32)    # unused
+        self.escape_sequences              = source.unpack_raw(32)    # unused in the primary VD
         self.volume_set_size               = source.unpack_both('h')
         self.volume_seq_num                = source.unpack_both('h')
         self.logical_block_size            = source.unpack_both('h')
@@ -32,24 +52,44 @@ class PrimaryVD(VolumeDescriptor):
         self.path_table_opt_l_loc          = source.unpack('<i')
         self.path_table_m_loc              = source.unpack('>i')
         self.path_table_opt_m_loc          = source.unpack('>i')
-        self.root_record                   = source.unpack_record()
-        self.volume_set_identifier         = source.unpack_string(128)
-        self.publisher_identifier          = source.unpack_string(128)
-        self.data_preparer_identifier      = source.unpack_string(128)
-        self.application_identifier        = source.unpack_string(128)
-        self.copyright_file_identifier     = source.unpack_string(38)
-        self.abstract_file_identifier      = source.unpack_string(36)
-        self.bibliographic_file_identifier = source.unpack_string(37)
+        self.root_record                   = source.unpack_record(joliet=self.joliet)
+        self.volume_set_identifier         = self.unpack_identifier(source, 128)
+        self.publisher_identifier          = self.unpack_identifier(source, 128)
+        self.data_preparer_identifier      = self.unpack_identifier(source, 128)
+        self.application_identifier        = self.unpack_identifier(source, 128)
+        self.copyright_file_identifier     = self.unpack_identifier(source, 38)
+        self.abstract_file_identifier      = self.unpack_identifier(source, 36)
+        self.bibliographic_file_identifier = self.unpack_identifier(source, 37)
         self.volume_datetime_created       = source.unpack_vd_datetime()
         self.volume_datetime_modified      = source.unpack_vd_datetime()
         self.volume_datetime_expires       = source.unpack_vd_datetime()
         self.volume_datetime_effective     = source.unpack_vd_datetime()
         self.file_structure_version        = source.unpack('B')
 
+    def unpack_identifier(self, source, length):
+        return source.unpack_string(length)
+
 
-class SupplementaryVD(VolumeDescriptor):
+class SupplementaryVD(PrimaryVD):
+    """
+    A supplementary volume descriptor. Laid out as the primary one, except for its flags and
+    escape sequences, which for Joliet select UCS-2: identifiers and the names in its
+    directory hierarchy and path table are then UCS-2, and are converted to UTF-8.
+    """
     name = "supplementary"
 
+    def __init__(self, source):
+        # The escape sequences decide how everything before them is decoded, so peek at them
+        source.unpack_raw(81)
+        self.joliet = source.unpack_raw(32)[:3] in JOLIET_ESCAPES
+        source.rewind_raw(113)
+        super(SupplementaryVD, self).__init__(source)
+
+    def unpack_identifier(self, source, length):
+        if self.joliet:
+            return source.unpack_ucs2_string(length)
+        return source.unpack_string(length)
+
 
 class PartitionVD(VolumeDescriptor):
     name = "partition"
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+'''
+Micro-benchmark for isoparser.source.Source.seek()
+
+Reports the cost per sector of seek() for windows from 1 sector up to
+multi-MB extents, for both cold reads (sectors fetched from the medium)
+and warm reads (every sector served from the sector cache). The cost per
+sector should stay roughly flat as the window grows.
+
+Uses an in-memory source, so no ISO is needed and disk speed does not
+enter into it.
+'''
+import sys
+import os
+import timeit
+from isoparser import source
+
+
+class MemorySource(source.Source):
+    def __init__(self, data, **kwargs):
+        super(MemorySource, self).__init__(**kwargs)
+        self._data = data
+
+    def _fetch(self, sector, count=1):
+        return self._data[sector*source.SECTOR_LENGTH:(sector+count)*source.SECTOR_LENGTH]
+
+
+def time_seek(src, n_sectors, warm):
+    '''
+    src-->MemorySource
+    n_sectors-->int: size of the seek() window
+    warm-->bool: whether sectors are already cached
+    Returns-->float: seconds per sector
+    '''
+    length = n_sectors * source.SECTOR_LENGTH
+    if warm:
+        src.seek(0, length)
+        stmt = lambda: src.seek(0, length)
+    else:
+        def stmt():
+            src.cache.clear()
+            src.seek(0, length)
+    timer = timeit.Timer(stmt)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=3, number=number))
+    return best / number / n_sectors
+
+
+if __name__ == '__main__':
+    max_sectors = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    src = MemorySource(os.urandom(max_sectors * source.SECTOR_LENGTH), min_fetch=1,
+                       max_fetch=1)
+    print('%10s %12s %16s %16s' % (
+        'sectors', 'bytes', 'cold ns/sector', 'warm ns/sector'))
+    n = 1
+    while n <= max_sectors:
+        cold = time_seek(src, n, warm=False)
+        warm = time_seek(src, n, warm=True)
+        print('%10d %12d %16.0f %16.0f' % (
+            n, n * source.SECTOR_LENGTH, cold * 1e9, warm * 1e9))
+        n *= 4
@@ -223,10 +223,17 @@ Identifying distro from an ISO:
 '''
 import os
 import re
-import subprocess
 import isoparser
 
 
+def _str(b):
+    '''
+    b-->bytes: name as stored in the ISO
+    Returns-->str
+    '''
+    return b if isinstance(b, str) else b.decode('utf-8', 'replace')
+
+
 class ISOParserExt(object):
     '''
     uses and extends isoparser
@@ -244,6 +251,14 @@ class ISOParserExt(object):
     def record(self):
         return self._iso.record
 
+    def prefetch(self, *paths):
+        '''
+        paths-->str: paths about to be looked up or read
+        Loads them with one batched read per directory level, which
+        saves many round trips when the ISO is a URL
+        '''
+        self._iso.prefetch(*[[x for x in p.split('/') if x] for p in paths])
+
     def has_dirpath(self, p):
         '''
         p-->str: path
@@ -285,6 +300,14 @@ class ISOParserExt(object):
             return True
         return False
 
+    @property
+    def volid(self):
+        '''
+        Returns-->str: volume id from the primary volume descriptor
+        '''
+        return _str(
+            self._iso.volume_descriptors['primary'].volume_identifier)
+
     def match_regex(self, d, r, is_dir=False):
         '''
         d-->str: directory path to search
@@ -310,6 +333,7 @@ def get_distro(iso_path):
     Returns-->str: distro
     '''
     iso = ISOParserExt(iso_path)
+    iso.prefetch('/ubuntu', '/debian', '/.disk/info', '/boot')
     # First distros that have SPECIFIC identifiers
     # Distros identified by top-level dir
 
@@ -478,6 +502,10 @@ class LinuxISO(object):
         self.iso_dir = os.path.dirname(self.iso_path)
         self.iso_file = os.path.basename(self.iso_path)
         self._iso = ISOParserExt(self.iso_path)
+        self._iso.prefetch(
+            '/remaster/remaster.txt', '/remaster/remaster.time',
+            '/boot/grub/grub.cfg', '/.disk/info', '/conf/bootid.txt',
+            '/boot/isolinux/boot.msg')
 
         # Default values for attributes
         self.distro_type = 'unknown'
@@ -497,12 +525,7 @@ class LinuxISO(object):
             pass
         self.volid = ''
         try:
-            cmd = 'isoinfo -d -i "%s"' % (self.iso_path,)
-            l = subprocess.check_output(cmd, shell=True).splitlines()
-            l = [x for x in l if x.startswith('Volume id: ')]
-            if l:
-                l = l[0]
-                self.volid = l.split(':')[1].strip()
+            self.volid = self._iso.volid
         except:
             pass
         if self.remaster_time and self.volid:
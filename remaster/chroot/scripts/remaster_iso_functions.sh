@@ -82,22 +82,23 @@ function extract_iso {
     fi
 
     echo "(extract_iso): Extracting ISO ... $(basename $local_iso)"
-    sudo rm -rf "$local_extract_dir"
-    sudo mkdir "$local_extract_dir"
+    local incremental=""
+    if [ -d "${local_extract_dir}/${ISO_EXTRACT_SUBDIR}" ]; then
+        # Tree kept from a previous run (see REMASTER_KEEP_ISO_TREE): only copy changes
+        incremental="-i"
+    else
+        sudo rm -rf "$local_extract_dir"
+        mkdir "$local_extract_dir"
+    fi
     local old_dir=$(pwd)
     cd "$local_extract_dir"
 
-    # mount iso
-    MOUNT_DIR=$(mktemp -d "${PROG_NAME}_tmp_XXXXXXXX")
-    sudo mount -o loop "$local_iso" "${MOUNT_DIR}" 1>/dev/null 2>&1
-
-    # extract iso directory structure from iso
-    sudo rm -rf "${ISO_EXTRACT_SUBDIR}"
-    sudo rsync -a "${MOUNT_DIR}"/ "${ISO_EXTRACT_SUBDIR}"
-
-    # unmount iso
-    sudo umount "${MOUNT_DIR}"
-    sudo rmdir "${MOUNT_DIR}"
+    # extract iso directory structure from iso (no need to mount it)
+    python3 "${PROG_DIR}"/extract_iso.py $incremental "$local_iso" "${ISO_EXTRACT_SUBDIR}" || {
+        cd $old_dir
+        echo "${PROG_NAME} (extract_iso): Extraction failed"
+        return 1
+    }
 
     cd $old_dir
     echo "(extract_iso): Completed"
@@ -312,7 +313,10 @@ function update_iso {
     fi
     cd "${local_extract_dir}"
     sudo rm -f isohdpfx.bin
-    sudo rm -rf "${local_iso_dir}"
+    # With REMASTER_KEEP_ISO_TREE set, keep the tree so the next extract_iso is incremental
+    if [ -z "${REMASTER_KEEP_ISO_TREE}" ]; then
+        sudo rm -rf "${local_iso_dir}"
+    fi
 
     echo "(update_iso): Completed"
     cd $old_dir
@@ -0,0 +1,140 @@
+"""
+Tests for extract_tree() against hostile names and existing symlinks, using a stand-in for
+an ISO object.
+
+Run from remaster/chroot/scripts with: python3 -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isoparser import rockridge
+from isoparser.extract import ExtractError, extract_tree
+
+
+def symlink_entry(target):
+    entry = rockridge.SL.__new__(rockridge.SL)
+    entry.path = target
+    return entry
+
+
+class FakeRecord(object):
+    timestamp = 1000000000
+
+    def __init__(self, is_directory=False, content=b"", susp_entries=()):
+        self.is_directory = is_directory
+        self.content = content
+        self.length = len(content)
+        self.susp_entries = list(susp_entries)
+
+    @property
+    def current_directory(self):
+        return self
+
+    def extract(self, path):
+        with open(path, "wb") as f:
+            f.write(self.content)
+        return self.length
+
+
+class FakeISO(object):
+    def __init__(self, entries):
+        self.root = FakeRecord(is_directory=True)
+        self._entries = entries
+
+    def walk(self):
+        return iter(self._entries)
+
+
+class TestExtractTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dest_dir = os.path.join(self.tmp_dir, "a", "b", "c", "dest")
+        self.outside = os.path.join(self.tmp_dir, "outside")
+        os.mkdir(self.outside)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assertNothingEscaped(self):
+        self.assertEqual(os.listdir(self.outside), [])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["a", "outside"])
+        self.assertFalse(os.path.lexists(os.path.join(self.tmp_dir, "a", "escaped!")))
+
+    def test_extract(self):
+        iso = FakeISO([
+            ((b"boot",), FakeRecord(is_directory=True)),
+            ((b"boot", b"grub.cfg"), FakeRecord(content=b"menuentry")),
+            ((b"link",), FakeRecord(susp_entries=[symlink_entry(b"boot/grub.cfg")])),
+        ])
+        stats = extract_tree(iso, self.dest_dir)
+        self.assertEqual((stats.directories, stats.files, stats.symlinks), (1, 1, 1))
+        with open(os.path.join(self.dest_dir, "link"), "rb") as f:
+            self.assertEqual(f.read(), b"menuentry")
+
+    def test_traversal_names(self):
+        for name in (b"../../../escaped!", b"..", b".", b"", b"x\0y", b"../../../../outside"):
+            iso = FakeISO([((name,), FakeRecord(content=b"escaped"))])
+            with self.assertRaises(ExtractError):
+                extract_tree(iso, self.dest_dir)
+            self.assertNothingEscaped()
+
+    def test_traversal_in_directory_name(self):
+        iso = FakeISO([
+            ((b"../../../escaped!",), FakeRecord(is_directory=True)),
+            ((b"../../../escaped!", b"file"), FakeRecord(content=b"escaped")),
+        ])
+        with self.assertRaises(ExtractError):
+            extract_tree(iso, self.dest_dir)
+        self.assertNothingEscaped()
+
+    def test_child_of_symlink(self):
+        # A symlink in the ISO, then an entry that would be written through it
+        iso = FakeISO([
+            ((b"link",), FakeRecord(susp_entries=[symlink_entry(self.outside.encode())])),
+            ((b"link", b"file"), FakeRecord(content=b"escaped")),
+        ])
+        with self.assertRaises(ExtractError):
+            extract_tree(iso, self.dest_dir)
+        self.assertNothingEscaped()
+
+    def test_existing_symlinks(self):
+        os.makedirs(self.dest_dir)
+        os.symlink(self.outside, os.path.join(self.dest_dir, "boot"))
+        os.symlink(os.path.join(self.outside, "file"), os.path.join(self.dest_dir, "file"))
+        iso = FakeISO([
+            ((b"boot",), FakeRecord(is_directory=True)),
+            ((b"boot", b"grub.cfg"), FakeRecord(content=b"menuentry")),
+            ((b"file",), FakeRecord(content=b"data")),
+        ])
+        for incremental in (False, True):
+            extract_tree(iso, self.dest_dir, incremental=incremental)
+            self.assertNothingEscaped()
+            self.assertFalse(os.path.islink(os.path.join(self.dest_dir, "boot")))
+            self.assertFalse(os.path.islink(os.path.join(self.dest_dir, "file")))
+
+    def test_incremental_removes_symlinks_only(self):
+        os.makedirs(self.dest_dir)
+        with open(os.path.join(self.outside, "keep"), "wb") as f:
+            f.write(b"keep")
+        os.symlink(self.outside, os.path.join(self.dest_dir, "stale"))
+        stats = extract_tree(FakeISO([]), self.dest_dir, incremental=True)
+        self.assertEqual(stats.removed, 1)
+        self.assertEqual(os.listdir(self.outside), ["keep"])
+
+    def test_duplicate_names(self):
+        iso = FakeISO([
+            ((b"boot",), FakeRecord(susp_entries=[symlink_entry(self.outside.encode())])),
+            ((b"boot",), FakeRecord(is_directory=True)),
+        ])
+        with self.assertRaises(ExtractError):
+            extract_tree(iso, self.dest_dir)
+        self.assertNothingEscaped()
+
+
+if __name__ == "__main__":
+    unittest.main()
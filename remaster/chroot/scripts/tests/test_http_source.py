@@ -0,0 +1,257 @@
+"""
+Tests for HTTPConnectionPool and HTTPSource against a local HTTP server.
+
+Run from remaster/chroot/scripts with: python3 -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isoparser.diskcache import DiskCache
+from isoparser.source import SECTOR_LENGTH, HTTPConnectionPool, HTTPSource, SourceError
+
+
+DATA = bytes(bytearray(i * 7 % 251 for i in range(SECTOR_LENGTH * 32)))
+BOUNDARY = "TESTBOUNDARY"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serves DATA. The server's mode picks how range requests are answered: "multipart"
+    (multipart/byteranges), "merge" (one range covering all those asked for), "single"
+    (only single ranges; several get the whole file) or "ignore" (always the whole file).
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _ranges(self):
+        header = self.headers.get("Range")
+        if header is None or not header.startswith("bytes="):
+            return None
+        ranges = []
+        for spec in header[len("bytes="):].split(","):
+            start, end = spec.split("-")
+            ranges.append((int(start), min(int(end), len(DATA) - 1)))
+        return ranges
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.server.log.append(("HEAD", None))
+        headers = [("ETag", self.server.etag)] if self.server.etag else []
+        self._send(200, DATA, headers)
+
+    def do_GET(self):
+        ranges = self._ranges()
+        self.server.log.append(("GET", ranges))
+        mode = self.server.mode
+        if ranges is None or mode == "ignore" or (mode == "single" and len(ranges) > 1):
+            self._send(200, DATA)
+        elif any(start >= len(DATA) for start, _ in ranges):
+            self._send(416, b"", [("Content-Range", "bytes */%d" % len(DATA))])
+        elif len(ranges) == 1 or mode == "merge":
+            start, end = min(r[0] for r in ranges), max(r[1] for r in ranges)
+            self._send(206, DATA[start:end + 1], [
+                ("Content-Range", "bytes %d-%d/%d" % (start, end, len(DATA)))])
+        else:
+            body = b""
+            for start, end in ranges:
+                body += ("--%s\r\nContent-Type: application/octet-stream\r\n"
+                         "Content-Range: bytes %d-%d/%d\r\n\r\n" % (
+                             BOUNDARY, start, end, len(DATA))).encode("ascii")
+                body += DATA[start:end + 1] + b"\r\n"
+            body += ("--%s--\r\n" % BOUNDARY).encode("ascii")
+            self._send(206, body, [
+                ("Content-Type", "multipart/byteranges; boundary=%s" % BOUNDARY)])
+
+
+class RangeServer(ThreadingMixIn, HTTPServer):
+    # Pooled connections stay open, so each needs its own thread
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients drop connections on purpose when they don't want the rest of a body
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class HTTPTestCase(unittest.TestCase):
+    mode = "multipart"
+    etag = '"v1"'
+
+    def setUp(self):
+        self.server = RangeServer(("127.0.0.1", 0), RangeHandler)
+        self.server.mode = self.mode
+        self.server.etag = self.etag
+        self.server.log = []
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = "http://127.0.0.1:%d/test.iso" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def gets(self):
+        return [ranges for method, ranges in self.server.log if method == "GET"]
+
+
+class TestConnectionPool(HTTPTestCase):
+    def test_single_range(self):
+        pool = HTTPConnectionPool(self.url)
+        self.assertEqual(pool.get_range(100, 50).read(), DATA[100:150])
+        # The connection went back to the pool and is reused
+        self.assertEqual(pool.get_range(5000, 10).read(), DATA[5000:5010])
+        self.assertEqual((pool.connections, pool.requests), (1, 2))
+        pool.close()
+
+    def test_range_cut_short_at_end(self):
+        pool = HTTPConnectionPool(self.url)
+        self.assertEqual(pool.get_range(len(DATA) - 10, 100).read(), DATA[-10:])
+        pool.close()
+
+    def test_unsatisfiable_range(self):
+        pool = HTTPConnectionPool(self.url)
+        with self.assertRaises(SourceError) as cm:
+            pool.get_range(len(DATA) + SECTOR_LENGTH, 10)
+        self.assertIn("416", str(cm.exception))
+        pool.close()
+
+    def test_multipart_ranges(self):
+        pool = HTTPConnectionPool(self.url)
+        ranges = [(0, 10), (4096, 100), (len(DATA) - 20, 20)]
+        results = pool.get_ranges(ranges)
+        self.assertEqual(results, dict((o, DATA[o:o + l]) for o, l in ranges))
+        self.assertEqual(len(self.gets()), 1)
+        pool.close()
+
+    def test_parse_multipart_without_content_range(self):
+        pool = HTTPConnectionPool(self.url)
+        body = b"--B\r\nContent-Type: application/octet-stream\r\n\r\nxx\r\n--B--\r\n"
+        with self.assertRaises(SourceError):
+            pool._parse_multipart(body, b"B")
+
+
+class TestMergedRanges(HTTPTestCase):
+    mode = "merge"
+
+    def test_merged_ranges(self):
+        pool = HTTPConnectionPool(self.url)
+        ranges = [(0, 10), (100, 10)]
+        self.assertEqual(pool.get_ranges(ranges), {0: DATA[0:10], 100: DATA[100:110]})
+        pool.close()
+
+
+class TestNoRangeSupport(HTTPTestCase):
+    mode = "ignore"
+
+    def test_whole_file_response(self):
+        pool = HTTPConnectionPool(self.url)
+        self.assertEqual(pool.get_range(3000, 500).read(), DATA[3000:3500])
+        # The rest of the body was not read, so the connection can't be reused
+        self.assertEqual(pool.get_range(0, 10).read(), DATA[:10])
+        self.assertEqual(pool.connections, 2)
+        pool.close()
+
+    def test_whole_file_response_to_multirange(self):
+        pool = HTTPConnectionPool(self.url)
+        self.assertEqual(pool.get_ranges([(0, 10), (100, 10)]), {})
+        self.assertFalse(pool.multirange)
+        pool.close()
+
+
+class TestSource(HTTPTestCase):
+    def test_download_multipart(self):
+        source = HTTPSource(self.url)
+        runs = [(0, 1), (4, 2), (31, 1)]
+        self.assertEqual(source._download(runs), [
+            DATA[s * SECTOR_LENGTH:(s + c) * SECTOR_LENGTH] for s, c in runs])
+        self.assertEqual(len(self.gets()), 1)
+        source.close()
+
+    def test_download_many_runs(self):
+        source = HTTPSource(self.url)
+        source.MAX_RANGES = 4
+        runs = [(s, 1) for s in range(0, 32, 3)]
+        self.assertEqual(source._download(runs), [
+            DATA[s * SECTOR_LENGTH:(s + 1) * SECTOR_LENGTH] for s, _ in runs])
+        self.assertEqual(len(self.gets()), 3)
+        source.close()
+
+    def test_get_stream(self):
+        source = HTTPSource(self.url)
+        self.assertEqual(source.get_stream(2, 100).read(), DATA[2 * SECTOR_LENGTH:][:100])
+        self.assertEqual(source.get_stream(2, 0).read(), b"")
+        source.close()
+
+    def test_disk_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache = DiskCache(cache_dir)
+            source = HTTPSource(self.url, disk_cache=cache)
+            self.assertEqual(self.server.log[0], ("HEAD", None))
+            self.assertIsNotNone(source._disk_entry)
+            runs = [(1, 2), (8, 1)]
+            expected = [DATA[s * SECTOR_LENGTH:(s + c) * SECTOR_LENGTH] for s, c in runs]
+            self.assertEqual(source._fetch_many(runs), expected)
+            source.close()
+            requests = len(self.gets())
+
+            # A second source is served from the cache, except for the sectors it lacks
+            source = HTTPSource(self.url, disk_cache=cache)
+            self.assertEqual(source._fetch_many(runs), expected)
+            self.assertEqual(len(self.gets()), requests)
+            self.assertEqual(source._fetch_many([(1, 3)]), [DATA[SECTOR_LENGTH:4 * SECTOR_LENGTH]])
+            self.assertEqual(self.gets()[-1], [(3 * SECTOR_LENGTH, 4 * SECTOR_LENGTH - 1)])
+            source.close()
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+class TestSourceSingleRanges(HTTPTestCase):
+    mode = "single"
+    etag = None
+
+    def test_parallel_fallback(self):
+        source = HTTPSource(self.url)
+        runs = [(s, 1) for s in range(0, 32, 2)]
+        self.assertEqual(source._download(runs), [
+            DATA[s * SECTOR_LENGTH:(s + 1) * SECTOR_LENGTH] for s, _ in runs])
+        self.assertFalse(source.pool.multirange)
+        # One refused multirange request, then one request per run
+        self.assertEqual(len(self.gets()), 1 + len(runs))
+        self.assertLessEqual(source.pool.connections, 1 + source.pool.size)
+        source.close()
+
+    def test_disk_cache_without_version(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            source = HTTPSource(self.url, disk_cache=DiskCache(cache_dir))
+            self.assertEqual(self.server.log, [("HEAD", None)])
+            self.assertIsNone(source._disk_entry)
+            self.assertEqual(source._fetch_many([(0, 1)]), [DATA[:SECTOR_LENGTH]])
+            source.close()
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for saving and loading TreeIndex sidecar files.
+
+Run from remaster/chroot/scripts with: python3 -m unittest discover tests
+"""
+import array
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from isoparser.index import FLAG_DIRECTORY, LAYOUT, TreeIndex, TreeIndexError
+
+
+def make_index():
+    # / -> boot/ -> grub.cfg, and /README
+    names = [b"", b"boot", b"README", b"grub.cfg"]
+    values = {
+        "mtimes": [0, 1, 2, 3],
+        "lengths": [2048, 2048, 10, 20],
+        "parents": [-1, 0, 0, 1],
+        "child_start": [1, 3, -1, -1],
+        "child_count": [2, 1, 0, 0],
+        "locations": [20, 21, 30, 31],
+        "flags": [FLAG_DIRECTORY, FLAG_DIRECTORY, 0, 0],
+    }
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+    values["name_offsets"] = offsets
+    arrays = dict((name, array.array(typecode, values[name])) for name, typecode, _ in LAYOUT)
+    return TreeIndex(b"k" * 20, b"".join(names), arrays)
+
+
+class TestTreeIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "test.isoidx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        make_index().save(self.path)
+        index = TreeIndex.load(self.path, b"k" * 20)
+        self.assertEqual(index.lookup(b"boot", b"grub.cfg"), 3)
+        self.assertEqual([path for path, _ in index.walk()],
+                         [(b"boot",), (b"boot", b"grub.cfg"), (b"README",)])
+        with self.assertRaises(KeyError):
+            index.lookup(b"boot", b"missing")
+
+    def test_other_key(self):
+        make_index().save(self.path)
+        with self.assertRaises(TreeIndexError):
+            TreeIndex.load(self.path, b"x" * 20)
+
+    def test_bad_files(self):
+        make_index().save(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for bad in (b"", data[:10], data[:40], data[:-1], data + b"\0", b"X" + data[1:]):
+            with open(self.path, "wb") as f:
+                f.write(bad)
+            with self.assertRaises(TreeIndexError):
+                TreeIndex.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
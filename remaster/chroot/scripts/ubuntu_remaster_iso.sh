@@ -8,7 +8,7 @@ PROG_NAME=$(basename ${PROG_PATH})
 
 . "${PROG_DIR}"/remaster_iso_functions.sh
 
-# Needs root privileges (to mount)
+# Needs root privileges (for the chroot)
 exit_if_not_root
 
 SQUASHFS_PATH=casper/filesystem.squashfs
@@ -48,4 +48,6 @@ run_remaster_commands "$EXTRACT_DIR" "${REMASTER_CMDS_DIR}"
 
 update_squashfs "$EXTRACT_DIR" "$SQUASHFS_PATH" "${MANIFEST_PATH}" "${SIZE_FILE}"
 update_iso "$EXTRACT_DIR" "${OUTPUT_ISO}" "$ISO_PATH" "$EFI_IMG_FILE" 
-rmdir "$EXTRACT_DIR"
+if [ -z "${REMASTER_KEEP_ISO_TREE}" ]; then
+    rmdir "$EXTRACT_DIR"
+fi
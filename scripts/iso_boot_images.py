@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+'''
+Lists the boot images in the El Torito boot catalog of an ISO, or writes
+out its EFI boot image
+
+Usage: iso_boot_images.py [-e EFI_IMG_PATH] ISO_PATH
+    -e:         Write the (first) EFI boot image to EFI_IMG_PATH, then
+                print 'appended' if it is in a partition appended after
+                the ISO9660 volume, or 'volume' if it is inside it.
+                Exits with 1 if there is no EFI boot image
+    ISO_PATH:   Full path to ISO
+
+Without -e, prints one line per image: platform, emulation, load segment,
+sector count, start sector and 'appended' or 'volume'
+'''
+import sys
+import os
+import isoparser
+from isoparser.eltorito import PLATFORM_EFI, ElToritoError
+
+COPY_SIZE = 1024 * 1024
+
+
+def placement(iso, entry):
+    '''
+    iso-->isoparser ISO
+    entry-->BootEntry
+    Returns-->str: 'appended' or 'volume'
+    '''
+    volume_size = iso.volume_descriptors['primary'].volume_space_size
+    if entry.location >= volume_size:
+        return 'appended'
+    return 'volume'
+
+
+def write_image(entry, path):
+    '''
+    entry-->BootEntry
+    path-->str: file to create / overwrite
+    Returns-->int: bytes written
+    '''
+    written = 0
+    stream = entry.get_stream()
+    try:
+        with open(path, 'wb') as f:
+            while True:
+                data = stream.read(COPY_SIZE)
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+    finally:
+        stream.close()
+    return written
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    efi_path = None
+    if '-e' in args:
+        i = args.index('-e')
+        efi_path = args[i + 1] if len(args) > i + 1 else None
+        del args[i:i + 2]
+        if efi_path is None:
+            args = []
+    if len(args) < 1:
+        print('Usage: %s [-e EFI_IMG_PATH] ISO_PATH' % (
+            os.path.basename(sys.argv[0]),))
+        exit(1)
+    if not os.path.isfile(args[0]):
+        sys.stderr.write('File not found: %s\n' % (args[0],))
+        exit(1)
+
+    with isoparser.parse(args[0]) as iso:
+        try:
+            catalog = iso.boot_catalog
+        except ElToritoError as e:
+            sys.stderr.write('%s: %s\n' % (args[0], e))
+            exit(1)
+        if catalog is None:
+            sys.stderr.write('No El Torito boot catalog: %s\n' % (args[0],))
+            exit(1)
+        for entry in catalog.entries:
+            if efi_path is None:
+                print('%-8s %-12s 0x%04x %5d %8d %s' % (
+                    entry.platform, entry.emulation, entry.load_segment,
+                    entry.sector_count, entry.location,
+                    placement(iso, entry)))
+            elif entry.platform_id == PLATFORM_EFI:
+                if not write_image(entry, efi_path):
+                    sys.stderr.write('Empty EFI boot image: %s\n' % (args[0],))
+                    exit(1)
+                print(placement(iso, entry))
+                exit(0)
+    if efi_path is not None:
+        sys.stderr.write('No EFI boot image: %s\n' % (args[0],))
+        exit(1)
@@ -1,5 +1,5 @@
 from __future__ import absolute_import
-from . import iso, source
+from . import eltorito, iso, source
 
 
 def parse(path_or_url, cache_content=False, min_fetch=16):
@@ -1,9 +1,18 @@
+import fnmatch
+import re
+
 from . import susp, rockridge
+from .eltorito import BootCatalog
+
+
+def _to_bytes(s):
+    return s if isinstance(s, bytes) else s.encode("utf-8")
 
 
 class ISO(object):
     def __init__(self, source):
         self._source = source
+        self._boot_catalog = None
 
         # Unpack volume descriptors
         self.volume_descriptors = {}
@@ -84,3 +93,82 @@ class ISO(object):
                 raise KeyError(part)
 
         return record
+
+    @property
+    def boot_catalog(self):
+        """
+        The El Torito :class:`eltorito.BootCatalog`, parsed on first use, or None if the ISO
+        is not bootable. Raises eltorito.ElToritoError if the catalog is invalid.
+        """
+        boot_vd = self.volume_descriptors.get('boot')
+        if boot_vd is None or boot_vd.catalog_location is None:
+            return None
+        if self._boot_catalog is None:
+            self._boot_catalog = BootCatalog(self._source, boot_vd.catalog_location)
+        return self._boot_catalog
+
+    def walk(self, *path):
+        """
+        Yields (path, record) for every entry below the directory at the given path, depth
+        first, path being a tuple of components. Each directory is read once, and only when
+        the walk reaches it, so stopping early saves reading the rest of the tree.
+        """
+        stack = [(tuple(path), iter(self.record(*path).children))]
+        while stack:
+            parent, children = stack[-1]
+            for child in children:
+                child_path = parent + (child.name,)
+                yield child_path, child
+                if child.is_directory:
+                    stack.append((child_path, iter(child.children)))
+                    break
+            else:
+                stack.pop()
+
+    def glob(self, pattern, ignore_case=False, is_dir=None):
+        """
+        Yields (path, record) for entries matching a shell-style pattern. A pattern without
+        a '/', like '*.efi', is matched against the names of entries at any depth. Otherwise
+        its components are matched against path components, '*' never matching a '/': then
+        only directories that can lead to a match are read, e.g. just /EFI and /EFI/BOOT for
+        'EFI/BOOT/*.efi'. is_dir, if not None, restricts matches to directories or files.
+        """
+        pattern = _to_bytes(pattern).strip(b"/")
+        if ignore_case:
+            pattern = pattern.lower()
+        if b"/" not in pattern:
+            for path, record in self.walk():
+                name = path[-1].lower() if ignore_case else path[-1]
+                if (is_dir is None or record.is_directory == is_dir) and \
+                        fnmatch.fnmatchcase(name, pattern):
+                    yield path, record
+            return
+
+        parts = pattern.split(b"/")
+        level = [((), self.root)]
+        for depth, part in enumerate(parts):
+            last = depth == len(parts) - 1
+            next_level = []
+            for path, record in level:
+                for child in record.children:
+                    name = child.name.lower() if ignore_case else child.name
+                    if not fnmatch.fnmatchcase(name, part):
+                        continue
+                    if last:
+                        if is_dir is None or child.is_directory == is_dir:
+                            yield path + (child.name,), child
+                    elif child.is_directory:
+                        next_level.append((path + (child.name,), child))
+            level = next_level
+
+    def find(self, regex, ignore_case=False, is_dir=None):
+        """
+        Yields (path, record) for entries whose path, joined with '/' and without a leading
+        '/', matches the given regular expression (using re.search). is_dir, if not None,
+        restricts matches to directories or files.
+        """
+        regex = re.compile(_to_bytes(regex), re.IGNORECASE if ignore_case else 0)
+        for path, record in self.walk():
+            if (is_dir is None or record.is_directory == is_dir) and \
+                    regex.search(b"/".join(path)):
+                yield path, record
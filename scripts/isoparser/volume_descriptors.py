@@ -8,9 +8,25 @@ class VolumeDescriptor(object):
         return "<VolumeDescriptor name=%r>" % self.name
 
 
+EL_TORITO = b"EL TORITO SPECIFICATION"
+
+
 class BootVD(VolumeDescriptor):
+    """
+    A boot record. For El Torito, catalog_location is the sector of the boot catalog; it is
+    None for other boot systems.
+    """
     name = "boot"
 
+    def __init__(self, source):
+        super(BootVD, self).__init__(source)
+
+        self.boot_system_identifier        = source.unpack_raw(32).rstrip(b"\x00 ")
+        self.boot_identifier               = source.unpack_raw(32).rstrip(b"\x00 ")
+        self.catalog_location              = None
+        if self.boot_system_identifier == EL_TORITO:
+            self.catalog_location          = source.unpack('<I')
+
 
 class PrimaryVD(VolumeDescriptor):
     name = "primary"
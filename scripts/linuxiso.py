@@ -3,10 +3,26 @@ import sys
 sys.dont_write_bytecode = True
 import os  # noqa: E402
 import re  # noqa: E402
-import subprocess  # noqa: E402
 import isoparser  # noqa: E402
 
 
+def _str(b):
+    '''
+    b-->bytes: name as stored in the ISO
+    Returns-->str
+    '''
+    return b if isinstance(b, str) else b.decode('utf-8', 'replace')
+
+
+# Files looked for by ISOParserExt in a single walk: regex searched in
+# paths and whether matches must be dirs (True), files (False) or either
+BOOT_FILES = {
+    'grub_cfg': (re.compile(br'grub\.cfg$'), False),
+    'uefi64': (re.compile(br'bootx64\.efi', re.IGNORECASE), None),
+    'uefi32': (re.compile(br'bootia32\.efi', re.IGNORECASE), None),
+}
+
+
 class ISOParserExt(object):
     '''
     uses and extends isoparser
@@ -15,6 +31,7 @@ class ISOParserExt(object):
     def __init__(self, iso_path):
         self.iso_path = iso_path
         self._iso = isoparser.parse(iso_path)
+        self._boot_files = None
 
     @property
     def root(self):
@@ -85,52 +102,52 @@ class ISOParserExt(object):
 
     @property
     def volid(self):
-        cmd = 'isoinfo -d -i "%s"' % (self.iso_path,)
-        l = subprocess.check_output(cmd, shell=True).splitlines()
-        l = [x for x in l if x.startswith('Volume id: ')]
-        if l:
-            l = l[0]
-            return l.split(':')[1].strip()
-        return ''
+        '''
+        Returns-->str: volume id from the primary volume descriptor
+        '''
+        return _str(
+            self._iso.volume_descriptors['primary'].volume_identifier)
+
+    def _boot_file(self, name):
+        '''
+        name-->str: one of BOOT_FILES
+        Returns-->tuple: (path starting with '/', record) or ('', None)
+        The first call walks the ISO once, recording the first match of
+        each of BOOT_FILES, and stops as soon as all are found
+        '''
+        if self._boot_files is None:
+            found = {}
+            for p, rec in self._iso.walk():
+                path = b'/'.join(p)
+                for key, (regex, is_dir) in BOOT_FILES.items():
+                    if key in found or (is_dir is not None and
+                                        rec.is_directory != is_dir):
+                        continue
+                    if regex.search(path):
+                        found[key] = ('/' + _str(path), rec)
+                if len(found) == len(BOOT_FILES):
+                    break
+            self._boot_files = found
+        return self._boot_files.get(name, ('', None))
 
     @property
     def grub_cfg_path(self):
-        cmd = 'isoinfo -R -i "%s" -f' % (self.iso_path,)
-        l = subprocess.check_output(cmd, shell=True).splitlines()
-        l = [x for x in l if x.endswith('grub.cfg')]
-        if l:
-            return l[0]
-        return ''
+        return self._boot_file('grub_cfg')[0]
 
     @property
     def grub_cfg_contents(self):
-        if not self.grub_cfg_path:
+        rec = self._boot_file('grub_cfg')[1]
+        if rec is None:
             return ''
-        cmd = 'isoinfo -R -i "%s" -x %s' % (self.iso_path, self.grub_cfg_path)
-        return subprocess.check_output(cmd, shell=True)
+        return rec.content
 
     @property
     def uefi64(self):
-        cmd = 'isoinfo -R -i "%s" -f' % (self.iso_path,)
-        lines = subprocess.check_output(cmd, shell=True).splitlines()
-        pat = 'bootx64.efi'
-        for l in lines:
-            m = re.search(pat, l, re.IGNORECASE)
-            if m:
-                return l
-        return ''
+        return self._boot_file('uefi64')[0]
 
     @property
     def uefi32(self):
-        cmd = 'isoinfo -R -i "%s" -f' % (self.iso_path,)
-        lines = subprocess.check_output(cmd, shell=True).splitlines()
-        pat = 'bootia32.efi'
-        for l in lines:
-            l = l.rstrip()
-            m = re.search(pat, l, re.IGNORECASE)
-            if m:
-                return l
-        return ''
+        return self._boot_file('uefi32')[0]
 
 
 def get_distro(iso_path):
@@ -282,31 +282,42 @@ function update_iso {
 
     # Groovy (onwards), Ubuntu has moved away from isolinux
     # and has EFI as a separate PARTITION on the ISO
+    # The El Torito boot catalog of input_iso locates the EFI image:
+    # iso_boot_images.py writes it to efi_image and prints 'appended'
+    # when it is in that partition
 
     local EFI_ISO=no
-    fdisk -l "$input_iso" | grep -q 'EFI System$' && EFI_ISO=yes
+    local efi_placement
+    efi_placement=$(python3 "${PROG_DIR}"/iso_boot_images.py -e "$efi_image" "$input_iso")
+    if [ $? -ne 0 ]; then
+        echo "${PROGNAME}: Could not get EFI boot image from ${input_iso}"
+        sudo rm -rf "$img_extract_dir"
+        return 1
+    fi
+    [[ "$efi_placement" = "appended" ]] && EFI_ISO=yes
 
     if [[ "$EFI_ISO" = "yes" ]]; then
         # GPT ISO with EFI partition
         boot_image="/boot/grub/i386-pc/eltorito.img"
         catalog="/boot.catalog"
         # MBR image
-        sudo -n dd if="$input_iso" bs=1 count=446 of="$mbr_image" 1>/dev/null 2>&1
-        # EFI image
-        # local skip=$(/sbin/fdisk -l "$input_iso" | fgrep '.iso2 ' | awk '{print $2}')
-        # local size=$(/sbin/fdisk -l "$input_iso" | fgrep '.iso2 ' | awk '{print $4}')
-        # sudo -n dd if="$input_iso" bs=512 skip="$skip" count="$size" of="$efi_image" 1>/dev/null 2>&1
-        rm -f "$efi_image"
-        mv "$extract_dir"/boot/grub/efi.img "$efi_image"
+        sudo -n dd if="$input_iso" bs=446 count=1 of="$mbr_image" 1>/dev/null 2>&1
+        # EFI image - the one in the tree (possibly customized) if any,
+        # else the one from the partition. Either way, not left in the tree
+        if [ -f "$extract_dir"/boot/grub/efi.img ]; then
+            rm -f "$efi_image"
+            mv "$extract_dir"/boot/grub/efi.img "$efi_image"
+        fi
     else
         boot_image="/isolinux/isolinux.bin"
         catalog="/isolinux/boot.cat"
         # isohdpfx - first 432 bytes of input_iso
-        sudo -n dd if="$input_iso" bs=1 count=432 of="$isohdpfx" 1>/dev/null 2>&1
+        sudo -n dd if="$input_iso" bs=432 count=1 of="$isohdpfx" 1>/dev/null 2>&1
 
-        # EFI image
-        cp "$extract_dir"/boot/grub/efi.img "$efi_image"
-        # efi_image="/boot/grub/efi.img"
+        # EFI image - the file in the tree if any, else the one from the boot catalog
+        if [ -f "$extract_dir"/boot/grub/efi.img ]; then
+            cp "$extract_dir"/boot/grub/efi.img "$efi_image"
+        fi
     fi
 
     # Following (also) works on Focal 20.04 Ubuntu-Mate (non-EFI ISO)